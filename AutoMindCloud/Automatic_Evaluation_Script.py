@@ -25,11 +25,11 @@ import IPython
 #from AutoMindCloud.AutoMindCloud.render import *
 
   
-from AutoMindCloud.Latemix2 import *
+from AutoMindCloud.Latemix2 import RenderLatex
 
 global DatosList,Orden,Color
 
-DatosList = []
+DatosList = []#Inicializar la reemplaza por una TablaDatos
 
 Orden = 0
 
@@ -70,7 +70,7 @@ def Inicializar(n,color):
 
   documento = ""
   
-  DatosList = []
+  DatosList = TablaDatos()
 
   Orden = n
 
@@ -78,23 +78,98 @@ def Inicializar(n,color):
 
   return DatosList
 
+class TablaDatos:
+  """Tabla de símbolos guardados con S().
+
+  Reemplaza la antigua lista de listas: cada componente queda indexado por su
+  símbolo en un dict (búsqueda O(1)), se conserva el orden de inserción para
+  mostrarla y se memoiza el LaTeX que search() entrega para cada valor.
+  Al iterarla se obtienen los mismos elementos [simbolo, valor] que antes.
+  """
+
+  def __init__(self, componentes=()):
+    self._datos = {}#simbolo -> [simbolo, valor]
+    self._latex = {}#simbolo -> {Orden: texto para search()}
+    self._pendientes = set()#Símbolos guardados con valor None
+    for c_componente in componentes:
+      self.append(c_componente)
+
+  def append(self, c_componente):
+    #Igual que list.append + búsqueda lineal: si el símbolo se repite, gana el primero.
+    if c_componente[0] not in self._datos:
+      self._datos[c_componente[0]] = c_componente
+      if c_componente[1] is None:
+        self._pendientes.add(c_componente[0])
+
+  def guardar(self, c_componente):
+    """Guarda el componente y retorna True si el símbolo ya estaba definido."""
+    #Los elementos guardados como None pasan a valer su propio símbolo (como hacía S()).
+    for simbolo in self._pendientes:
+      element = self._datos[simbolo]
+      element[1] = element[0]
+      self._latex.pop(simbolo, None)#El valor cambió: se borra su caché.
+    self._pendientes.clear()
+
+    simbolo = c_componente[0]
+    element = self._datos.get(simbolo)
+    dentro = element is not None
+    if dentro:
+      element[1] = c_componente[1]#Sobre escribimos lo que el componente significaba.
+    else:
+      self._datos[simbolo] = c_componente
+    if c_componente[1] is None:
+      self._pendientes.add(simbolo)
+    #Caché nueva para este valor, llenada de inmediato con el Orden actual.
+    self._latex[simbolo] = {Orden: _LatexValor(simbolo, c_componente[1])}
+    return dentro
+
+  def latex(self, simbolo):
+    """LaTeX con el que search() reemplaza al símbolo (memoizado por Orden)."""
+    element = self._datos.get(simbolo)
+    if element is None:
+      return sympy.latex(simbolo)
+    cache = self._latex.setdefault(simbolo, {})
+    texto = cache.get(Orden)
+    if texto is None:
+      texto = cache[Orden] = _LatexValor(simbolo, element[1])
+    return texto
+
+  def __getitem__(self, simbolo):
+    return self._datos[simbolo][1]
+
+  def __contains__(self, simbolo):
+    return simbolo in self._datos
+
+  def __iter__(self):
+    return iter(self._datos.values())
+
+  def __len__(self):
+    return len(self._datos)
+
+  def __repr__(self):
+    return repr(list(self._datos.values()))
+
+
+def _LatexValor(simbolo, valor):#Texto con el que search() reemplaza al símbolo.
+  if isinstance(valor,float):#Si tenemos un numero
+    return "("+str(valor)+")"
+  elif isinstance(valor,int):#Si tenemos un float
+    return "("+str(valor)+")"
+  elif valor is not None:#Si tenemos una expresión
+    return "("+sympy.latex(valor)+")"
+  else:
+    return sympy.latex(simbolo)#Si es None
+
+
 def search(symbolo,DatosList):
 
-  #display(DatosList)
+  if isinstance(DatosList, TablaDatos):
+    return DatosList.latex(symbolo)
 
-  #global DatosList,Orden,Color#Documento
-  #global DatosList
-  
+  #Lista simple (formato antiguo): búsqueda lineal.
   for c_element in DatosList:
     if c_element[0] == symbolo:
-      if isinstance(c_element[1],float):#Si tenemos un numero
-          return "("+str(c_element[1])+")"
-      elif isinstance(c_element[1],int):#Si tenemos un float
-          return "("+str(c_element[1])+")"
-      elif c_element[1] != None:#Si tenemos una expresión
-          return "("+sympy.latex(c_element[1])+")"
-      else:
-        return sympy.latex(symbolo)#Si es None
+      return _LatexValor(symbolo, c_element[1])
   return sympy.latex(symbolo)
 
 
@@ -109,22 +184,13 @@ def Redondear(expr):#Redondeamos la expresión.
 
 def S(c_componente):#Guardar
   global DatosList,Orden,Color#Documento
-  dentro = False
-  for element in DatosList:
 
-    #Si es un elemento None, entonces guardamos de forma especial:
-    if element[1] == None:
-      element[1] = element[0]
+  if not isinstance(DatosList, TablaDatos):#Permite seguir usando una lista simple
+    DatosList = TablaDatos(DatosList)
 
-    if element[0] == c_componente[0]:
-      element[1] = c_componente[1]
-      dentro = True#Si el elemento ha sido guardado antes, entonces no lo volvemos a ingresar. Sino que sobre escribimos lo que dicho
-      #componente significaba con el valor actual que se desea guardar.
-
-      
-  if dentro == False:
-    
-    DatosList.append(c_componente)#Si el elemento no estaba adentro, simplemente lo agregamos.
+  #Si el elemento ha sido guardado antes, entonces no lo volvemos a ingresar. Sino que sobre escribimos lo que dicho
+  #componente significaba con el valor actual que se desea guardar.
+  dentro = DatosList.guardar(c_componente)
 
   #Renderizado Gris
   if c_componente[1] == None or dentro == False:
@@ -1,11 +1,11 @@
 # Google Colab drawing board that plays a bundled click_sound.mp3 entirely
 # client-side (no visible audio player and no "button pressed" text in the
-# notebook). Just upload click_sound.mp3 (or change _audio_filename), run the
-# cell, then call board("Dibujo 1").
+# notebook). A click_sound.mp3 in the working directory (or _audio_filename)
+# overrides the copy shipped with the package; call board("Dibujo 1").
 #
 # Behavior:
-# - The MP3 is read on the kernel, encoded as a data: URI and embedded in the
-#   displayed HTML/JS.
+# - The MP3 is read on the kernel the first time board() runs, encoded as a
+#   data: URI and embedded in the displayed HTML/JS.
 # - Toolbar button clicks call the browser to play the sound directly (no
 #   kernel round-trip, no Audio widget shown).
 #
@@ -21,15 +21,11 @@ from IPython.display import HTML, display
 from google.colab import output
 import re, base64, os, uuid, json
 
-# Load the mp3 file into a base64 string if present
-b64_audio = None
+from AutoMindCloud._assets import click_sound_data_url
+from AutoMindCloud._workspace import workspace_path
+
+# Optional local override of the bundled click sound (read lazily by board())
 _audio_filename = "click_sound.mp3"
-if os.path.exists(_audio_filename):
-    try:
-        with open(_audio_filename, "rb") as f:
-            b64_audio = base64.b64encode(f.read()).decode("ascii")
-    except Exception:
-        b64_audio = None
 
 _SNAPSHOT_HANDLES = {}          # serial -> DisplayHandle (bloque oculto/externo con display_id)
 _REGISTERED_CALLBACKS = set()   # callbacks registrados
@@ -42,7 +38,7 @@ def _sanitize_serial(s: str) -> str:
 def _make_snapshot_callback(serial: str):
     container_id = f"amc_persisted_snapshot_container_{serial}"
     img_id = f"amc_persisted_snapshot_{serial}"
-    png_path = f"/content/pizarra_cell_{serial}.png"
+    png_path = workspace_path(f"pizarra_cell_{serial}.png")
 
     def _cb(data_url_png: str):
         m = re.match(r'^data:image/png;base64,(.*)$', data_url_png or '')
@@ -131,8 +127,8 @@ def _extract_snapshot_from_ipynb(serial: str) -> str:
 
 def board(serial: str = "board"):
     """
-    Display the board. If click_sound.mp3 was present when this cell ran,
-    the sound will be embedded in the page and played client-side on toolbar
+    Display the board. The click sound (local click_sound.mp3 if present,
+    otherwise the bundled one) will be embedded in the page and played client-side on toolbar
     button clicks without showing an audio widget.
     """
     serial = _sanitize_serial(serial)
@@ -141,13 +137,13 @@ def board(serial: str = "board"):
     STORAGE_KEY  = f"amc_pizarra_snapshot_dataurl_{serial}"
     IMG_ID       = f"amc_persisted_snapshot_{serial}"
     CONTAINER_ID = f"amc_persisted_snapshot_container_{serial}"
-    PNG_PATH     = f"/content/pizarra_cell_{serial}.png"
+    PNG_PATH     = workspace_path(f"pizarra_cell_{serial}.png")
 
     initial_data_url = _extract_snapshot_from_ipynb(serial) or _file_to_dataurl(PNG_PATH)
 
-    # Prepare JS-safe audio data URL if we have base64 audio
-    if b64_audio:
-        audio_dataurl = "data:audio/mpeg;base64," + b64_audio
+    # Prepare JS-safe audio data URL if we have audio
+    audio_dataurl = click_sound_data_url(_audio_filename)
+    if audio_dataurl:
         # json.dumps produces a properly-escaped JS string literal
         audio_dataurl_js = json.dumps(audio_dataurl)
     else:
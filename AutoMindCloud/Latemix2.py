@@ -36,10 +36,13 @@ import re
 
 #from AutoMindCloud.LatexRenderScript import DatosList,Orden,Color
 
-from AutoMindCloud.Automatic_Evaluation_Script import *
+#search/TablaDatos se importan dentro de las funciones que los usan, para no
+#crear un import circular con Automatic_Evaluation_Script.
 
 import IPython
 
+DatosList = []#RenderLatex la reemplaza por la tabla del render actual
+
 # Use the imported variable
 #print(f"The color is: {Color}")
 
@@ -3114,9 +3117,13 @@ def RenderLatex(info, **settings):
     if isinstance(info, list):#len(info) == 2: 
         global DatosList
 
+        from AutoMindCloud.Automatic_Evaluation_Script import TablaDatos
+
         expr = info[0]
 
         DatosList = info[1]
+        if not isinstance(DatosList, TablaDatos):#Lista simple -> tabla indexada (una vez por render)
+            DatosList = TablaDatos(DatosList)
     else:
         #if len(info) == 1:
         expr = info
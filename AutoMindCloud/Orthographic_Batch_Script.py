@@ -0,0 +1,171 @@
+"""
+Headless batch export of orthographic drawings (no notebook needed).
+
+    python -m AutoMindCloud.Orthographic_Batch_Script parts/ "more/**/*.step" -o drawings --png
+
+Every STEP file gets a folder <out>/<name>/ with one SVG (and optionally
+PNG) per view. Files are processed in a process pool. <out>/manifest.json
+records each input's SHA-256 and the export options, so files whose
+contents and options are unchanged are skipped on the next run. Per-file
+timings are printed and written to <out>/timings.csv.
+
+PNGs are drawn with matplotlib (installed with cadquery's vtk).
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from AutoMindCloud import _batch
+from AutoMindCloud._cache import file_digest
+
+
+def _rgb(value, default=(0, 0, 0)):
+    try:
+        return tuple(int(c) / 255.0 for c in value.strip()[4:-1].split(","))
+    except (AttributeError, ValueError):
+        return default
+
+
+def _svg_png(svg, path, width_px=1600):
+    """Rasterize a getSVG drawing (polylines in <g stroke=...> groups) with matplotlib."""
+    import xml.etree.ElementTree as ET
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+
+    def walk(el, stroke, dashed):
+        stroke = el.get("stroke", stroke)
+        dashed = dashed or bool(el.get("stroke-dasharray"))
+        d = el.get("d")
+        if d:
+            lines = [[tuple(map(float, t[1:].split(","))) for t in seg.split()]
+                     for seg in ("M" + s for s in d.split("M")[1:])]
+            yield stroke, dashed, lines
+        for child in el:
+            yield from walk(child, stroke, dashed)
+
+    fig = plt.figure(figsize=(width_px / 200.0, width_px / 200.0 * 0.75), dpi=200)
+    ax = fig.add_axes([0, 0, 1, 1])
+    for stroke, dashed, lines in walk(ET.fromstring(svg), None, False):
+        ax.add_collection(LineCollection(lines, colors=[_rgb(stroke)], linewidths=0.6,
+                                         linestyles="--" if dashed else "-"))
+    ax.autoscale()
+    ax.set_aspect("equal")
+    ax.margins(0.05)
+    ax.axis("off")
+    fig.savefig(path, facecolor="white")
+    plt.close(fig)
+
+
+def _export_one(path, digest, target_dir, views, svg_opts, svg_precision, png):
+    """Worker: write the views of one STEP file. Returns its manifest entry."""
+    from AutoMindCloud import Step_Orthographic_Render_Script as ortho
+    from AutoMindCloud._svg import clean_svg, optimize_svg
+
+    t0 = time.perf_counter()
+    entry = {"sha256": digest, "outputs": [], "error": None}
+    try:
+        svgs = ortho._generate_orthographic_svgs(
+            lambda: ortho._import_step(path),
+            views=views,
+            parallel=False,  # the pool already runs one file per process
+            svg_opts=svg_opts,
+            digest=digest,
+        )
+        os.makedirs(target_dir, exist_ok=True)
+        for title, svg in svgs:
+            svg = clean_svg(svg)
+            if svg_precision is not None:
+                svg = optimize_svg(svg, svg_precision)
+            base = os.path.join(target_dir, _batch.slug(title))
+            _batch.write_atomic(base + ".svg", svg)
+            entry["outputs"].append(base + ".svg")
+            if png:
+                _svg_png(svg, base + ".png")
+                entry["outputs"].append(base + ".png")
+    except Exception as e:
+        entry["error"] = f"{type(e).__name__}: {e}"
+    entry["seconds"] = round(time.perf_counter() - t0, 3)
+    return entry
+
+
+def Export_Orthographic_Batch(inputs, out_dir, views=None, workers=None, png=False,
+                              svg_precision=None, svg_opts=None, force=False, verbose=True):
+    """
+    Export orthographic SVG (and PNG) sets for many STEP files.
+
+    inputs: folders, glob patterns and/or STEP paths.
+    views / svg_opts / svg_precision: as in Step_Orthographic_Render.
+    force: re-export even when the manifest says the file is up to date.
+    Returns the manifest ({"options": ..., "files": {path: entry}}).
+    """
+    from AutoMindCloud.Step_Orthographic_Render_Script import _resolve_views
+
+    if png:
+        import matplotlib  # noqa: F401  (fail before starting the pool)
+
+    paths = _batch.expand_inputs(inputs)
+    os.makedirs(out_dir, exist_ok=True)
+    options = {"views": _resolve_views(views), "svg_opts": svg_opts or {},
+               "svg_precision": svg_precision, "png": bool(png)}
+    options = json.loads(json.dumps(options))  # tuples -> lists, as stored in the manifest
+    old_files = _batch.load_manifest(out_dir, options)
+    names = _batch.output_names(paths)
+
+    files, todo = {}, []
+    for p in paths:
+        digest = file_digest(p)
+        if not force and _batch.is_current(old_files.get(p), digest):
+            files[p] = dict(old_files[p], skipped=True)
+        else:
+            todo.append((p, digest))
+
+    t0 = time.perf_counter()
+    if todo:
+        workers = workers or min(len(todo), os.cpu_count() or 1)
+        args = [(p, d, os.path.join(out_dir, names[p]), views, svg_opts, svg_precision, png)
+                for p, d in todo]
+        if workers > 1 and len(todo) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_export_one, *zip(*args)))
+        else:
+            results = [_export_one(*a) for a in args]
+        for (p, _), entry in zip(todo, results):
+            files[p] = dict(entry, skipped=False)
+    wall = time.perf_counter() - t0
+
+    manifest = _batch.save_run(out_dir, options, paths, files)
+    if verbose:
+        _batch.print_summary(paths, files, wall, out_dir)
+    return manifest
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Export orthographic drawings (SVG/PNG) for STEP files.")
+    ap.add_argument("inputs", nargs="+", help="STEP files, folders or glob patterns")
+    ap.add_argument("-o", "--out", default="orthographic", help="output folder (default: ./orthographic)")
+    ap.add_argument("--views", nargs="+", default=None,
+                    help="view names (front back top bottom left right iso); default: front top right bottom")
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--png", action="store_true", help="also write PNGs (needs matplotlib)")
+    ap.add_argument("--precision", type=int, default=None, help="round SVG coordinates to N decimals")
+    ap.add_argument("--no-hidden", action="store_true", help="omit hidden lines")
+    ap.add_argument("--force", action="store_true", help="re-export unchanged files")
+    args = ap.parse_args(argv)
+
+    manifest = Export_Orthographic_Batch(
+        args.inputs, args.out, views=args.views, workers=args.workers, png=args.png,
+        svg_precision=args.precision, svg_opts={"showHidden": False} if args.no_hidden else None,
+        force=args.force,
+    )
+    return 1 if any(e["error"] for e in manifest["files"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
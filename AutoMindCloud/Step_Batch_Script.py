@@ -0,0 +1,174 @@
+"""
+Headless batch STEP/STL -> scaled GLB conversion (Step_Render's pipeline, no HTML).
+
+    python -m AutoMindCloud.Step_Batch_Script parts/ "more/**/*.step" -o glb --timeout 300 --memory-mb 4096
+
+Each file is converted by Step_To_GLB in its own child process, with at
+most `workers` running at once. A child that runs past `timeout` seconds
+is killed. `memory_mb` caps a child's address space (RLIMIT_AS, Unix
+only). Failed or killed conversions are retried `retries` times.
+<out>/manifest.json records each input's SHA-256 and the options, so only
+new or changed files are converted again. Per-file timings are printed
+and written to <out>/timings.csv.
+"""
+
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from collections import deque
+
+from AutoMindCloud import _batch
+from AutoMindCloud._cache import file_digest
+
+INPUT_EXTS = (".step", ".stp", ".stl")
+
+
+def _convert_child(conn, source, output_path, target_size, digest, memory_mb):
+    """Child process body: convert one file and report ("ok", None) or ("error", message)."""
+    try:
+        if memory_mb:
+            import resource
+
+            limit = int(memory_mb) << 20
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        from AutoMindCloud.Step_Render_Script import Step_To_GLB
+
+        tmp = output_path + ".part"
+        Step_To_GLB(source, tmp, target_size=target_size, digest=digest)
+        os.replace(tmp, output_path)
+        conn.send(("ok", None))
+    except MemoryError:
+        conn.send(("error", "MemoryError: over the %s MB limit" % memory_mb))
+    except BaseException as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _run_jobs(jobs, workers, timeout, memory_mb, retries, target_size):
+    """
+    Convert [(source, digest, output_path)]; returns {source: entry}.
+    Simple scheduler over child processes so a stuck conversion can be killed.
+    """
+    ctx = multiprocessing.get_context()
+    queue = deque((job, 1) for job in jobs)
+    running = []  # (process, conn, job, attempt, start)
+    results = {}
+
+    def finish(job, attempt, start, error):
+        source, digest, output_path = job
+        if error:
+            try:
+                os.remove(output_path + ".part")  # left behind by a killed child
+            except OSError:
+                pass
+        if error and attempt <= retries:
+            queue.append((job, attempt + 1))
+            return
+        results[source] = {
+            "sha256": digest,
+            "outputs": [] if error else [output_path],
+            "error": error,
+            "attempts": attempt,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+
+    while queue or running:
+        while queue and len(running) < workers:
+            job, attempt = queue.popleft()
+            parent, child = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=_convert_child,
+                               args=(child, job[0], job[2], target_size, job[1], memory_mb), daemon=True)
+            proc.start()
+            child.close()
+            running.append((proc, parent, job, attempt, time.perf_counter()))
+
+        time.sleep(0.05)
+        still = []
+        for proc, conn, job, attempt, start in running:
+            message = None
+            if conn.poll():
+                try:
+                    message = conn.recv()
+                except EOFError:
+                    pass
+            if message is None and proc.is_alive():
+                if timeout and time.perf_counter() - start > timeout:
+                    proc.kill()
+                    proc.join()
+                    conn.close()
+                    finish(job, attempt, start, "timed out after %gs" % timeout)
+                else:
+                    still.append((proc, conn, job, attempt, start))
+                continue
+            proc.join()
+            conn.close()
+            if message is None:
+                message = ("error", "worker exited with code %s" % proc.exitcode)
+            finish(job, attempt, start, message[1] if message[0] == "error" else None)
+        running = still
+    return results
+
+
+def Convert_Step_Batch(inputs, out_dir, target_size=2.0, workers=None, timeout=600, memory_mb=None,
+                       retries=1, force=False, verbose=True):
+    """
+    Convert many STEP/STL files to scaled GLBs in out_dir (<name>.glb).
+
+    inputs: folders, glob patterns and/or file paths.
+    timeout: seconds per conversion attempt (None: no limit).
+    memory_mb: address-space cap per conversion (None: no limit).
+    retries: extra attempts after a failure or timeout.
+    force: convert even when the manifest says the output is up to date.
+    Returns the manifest ({"options": ..., "files": {path: entry}}).
+    """
+    paths = _batch.expand_inputs(inputs, INPUT_EXTS)
+    os.makedirs(out_dir, exist_ok=True)
+    options = {"target_size": float(target_size)}
+    old_files = _batch.load_manifest(out_dir, options)
+    names = _batch.output_names(paths)
+
+    files, todo = {}, []
+    for p in paths:
+        digest = file_digest(p)
+        if not force and _batch.is_current(old_files.get(p), digest):
+            files[p] = dict(old_files[p], skipped=True)
+        else:
+            todo.append((p, digest, os.path.join(out_dir, names[p] + ".glb")))
+
+    t0 = time.perf_counter()
+    if todo:
+        workers = workers or min(len(todo), os.cpu_count() or 1)
+        for p, entry in _run_jobs(todo, workers, timeout, memory_mb, retries, target_size).items():
+            files[p] = dict(entry, skipped=False)
+    wall = time.perf_counter() - t0
+
+    manifest = _batch.save_run(out_dir, options, paths, files)
+    if verbose:
+        _batch.print_summary(paths, files, wall, out_dir)
+    return manifest
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Convert STEP/STL files to scaled GLB.")
+    ap.add_argument("inputs", nargs="+", help="STEP/STL files, folders or glob patterns")
+    ap.add_argument("-o", "--out", default="glb", help="output folder (default: ./glb)")
+    ap.add_argument("--target-size", type=float, default=2.0, help="largest extent after scaling (default: 2.0)")
+    ap.add_argument("--workers", type=int, default=None, help="parallel conversions (default: CPU count)")
+    ap.add_argument("--timeout", type=float, default=600, help="seconds per attempt, 0 for no limit (default: 600)")
+    ap.add_argument("--memory-mb", type=int, default=None, help="address-space limit per conversion")
+    ap.add_argument("--retries", type=int, default=1, help="extra attempts after a failure (default: 1)")
+    ap.add_argument("--force", action="store_true", help="convert unchanged files again")
+    args = ap.parse_args(argv)
+
+    manifest = Convert_Step_Batch(
+        args.inputs, args.out, target_size=args.target_size, workers=args.workers,
+        timeout=args.timeout or None, memory_mb=args.memory_mb, retries=args.retries, force=args.force,
+    )
+    return 1 if any(e.get("error") for e in manifest["files"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
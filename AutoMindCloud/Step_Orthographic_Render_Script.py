@@ -8,37 +8,206 @@ Jupyter widget panel to cycle orthographic views of a STEP file using CadQuery.
 - AutoMind logo watermark fixed at bottom-right (configurable).
 """
 
+import io
 import os
-import re
+import math
 import json
 import uuid
-import base64
+import hashlib
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
 import cadquery as cq
 from cadquery import exporters
-import ipywidgets as widgets
-
-
-def _generate_orthographic_svgs(result):
-    views = [
-        ("Front View", (1, 0, 0), 0),
-        ("Top View", (1, 0, 0), 90),
-        ("Right Side View", (0, 1, 0), 90),
-        ("Bottom View", (1, 0, 0), -90),
-    ]
-    svgs = []
-    for title, axis, angle in views:
+from OCP.gp import gp_Ax2, gp_Dir, gp_Pnt
+
+from AutoMindCloud._assets import click_sound_data_url
+from AutoMindCloud._cache import DiskCache, cache_root, file_digest
+from AutoMindCloud._shape_cache import SHAPE_CACHE
+from AutoMindCloud._svg import clean_svg, optimize_svg
+
+
+# Named view directions: the vector points from the part towards the camera.
+# Drawings keep +Z up (+Y up for top, -Y for bottom) unless a view gives its own up vector.
+VIEW_DIRECTIONS = {
+    "front": ("Front View", (0, -1, 0)),
+    "back": ("Back View", (0, 1, 0)),
+    "top": ("Top View", (0, 0, 1)),
+    "bottom": ("Bottom View", (0, 0, -1)),
+    "right": ("Right Side View", (1, 0, 0)),
+    "left": ("Left Side View", (-1, 0, 0)),
+    "iso": ("Isometric View", (1, -1, 1)),
+}
+
+DEFAULT_VIEWS = ("front", "top", "right", "bottom")
+
+# getSVG options used for every view (projectionDir is set per view)
+SVG_OPTS = {"showAxes": False}
+
+SVG_CACHE = DiskCache(os.path.join(cache_root(), "svg"), 256 << 20, ".svg")
+
+# Per-view byte counts of the last svg_precision optimization (see Step_Orthographic_Render)
+last_svg_report = []
+
+
+def _import_step(path):
+    """cq.importers.importStep through the process-wide SHAPE_CACHE (treat the result as read-only)."""
+    return SHAPE_CACHE.get_or_load("cadquery", path, cq.importers.importStep)
+
+
+def _resolve_views(views=None):
+    """
+    Normalize `views` into [(title, direction, up)]. Items may be names from
+    VIEW_DIRECTIONS, (title, direction) pairs, (title, direction, up)
+    triples or bare direction vectors.
+    """
+    out = []
+    for v in views or DEFAULT_VIEWS:
+        if isinstance(v, str):
+            try:
+                title, direction = VIEW_DIRECTIONS[v.lower()]
+            except KeyError:
+                raise ValueError(f"Unknown view {v!r}; expected one of {sorted(VIEW_DIRECTIONS)}") from None
+            up = None
+        elif len(v) in (2, 3) and isinstance(v[0], str):
+            title, direction, up = (tuple(v) + (None,))[:3]
+        else:
+            title, direction, up = "View (%g, %g, %g)" % tuple(v), v, None
+        direction = tuple(float(c) for c in direction)
+        if len(direction) != 3 or not any(direction):
+            raise ValueError(f"Invalid view direction for {title!r}: {direction}")
+        if up is None:
+            dx, dy, dz = direction
+            up = (0.0, 1.0 if dz > 0 else -1.0, 0.0) if abs(dz) > 0.999 * (dx * dx + dy * dy + dz * dz) ** 0.5 else (0.0, 0.0, 1.0)
+        up = tuple(float(c) for c in up)
+        if cq.Vector(*up).cross(cq.Vector(*direction)).Length < 1e-9:
+            raise ValueError(f"Up vector {up} of {title!r} is parallel to its direction")
+        out.append((title, direction, up))
+    return out
+
+
+def _view_key(digest, direction, up, opts):
+    blob = json.dumps([digest, direction, up, opts], sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _error_svg(title, e):
+    return (
+        "<svg xmlns='http://www.w3.org/2000/svg' width='480' height='120'>"
+        f"<text x='10' y='24' fill='red'>Error generating {title}: {e}</text></svg>"
+    )
+
+
+def _shape_to_brep(shape):
+    buf = io.BytesIO()
+    shape.exportBrep(buf)
+    return buf.getvalue()
+
+
+def _view_svg(shape, direction, up, opts):
+    """
+    Hidden-line projection straight along `direction` with `up` pointing up.
+
+    getSVG lets OCCT pick the drawing's x axis, so the shape is first turned
+    about the view axis to bring the requested one there. moved() only sets
+    a location on the shape; the geometry is neither copied nor transformed.
+    """
+    d = cq.Vector(*direction).normalized()
+    right = cq.Vector(*up).cross(d).normalized()
+    x_occt = cq.Vector(gp_Ax2(gp_Pnt(), gp_Dir(*direction)).XDirection())
+    angle = math.degrees(math.atan2(right.cross(x_occt).dot(d), right.dot(x_occt)))
+    if abs(angle) > 1e-9:
+        shape = shape.moved(cq.Location(cq.Vector(0, 0, 0), d, angle))
+    return exporters.getSVG(shape, opts=dict(opts, projectionDir=direction))
+
+
+def _view_svg_from_brep(brep, direction, up, opts):
+    """Process-pool worker: rebuild the shape from its BRep bytes and render one view."""
+    return _view_svg(cq.Shape.importBrep(io.BytesIO(brep)), direction, up, opts)
+
+
+def _render_views(shape, jobs, parallel, max_workers):
+    """{job index: svg text or the exception raised} for [(title, direction, up, opts)]."""
+    out = {}
+    if parallel and len(jobs) > 1:
+        try:
+            brep = _shape_to_brep(shape)
+            workers = max_workers or min(len(jobs), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_view_svg_from_brep, brep, d, u, o) for _, d, u, o in jobs]
+                for i, f in enumerate(futures):
+                    try:
+                        out[i] = f.result()
+                    except BrokenExecutor:
+                        raise
+                    except Exception as e:
+                        out[i] = e
+            return out
+        except Exception:
+            out = {}  # no usable process pool (or BRep export failed): render in this process
+
+    for i, (_, d, u, o) in enumerate(jobs):
         try:
-            rotated = result.rotate((0, 0, 0), axis, angle)
-            shape = rotated.val() if hasattr(rotated, "val") else rotated
-            svg_str = exporters.getSVG(shape, opts={"showAxes": False})
-            svgs.append((title, svg_str))
+            out[i] = _view_svg(shape, d, u, o)
         except Exception as e:
-            err_svg = (
-                "<svg xmlns='http://www.w3.org/2000/svg' width='480' height='120'>"
-                f"<text x='10' y='24' fill='red'>Error generating {title}: {e}</text></svg>"
-            )
-            svgs.append((title, err_svg))
-    return svgs
+            out[i] = e
+    return out
+
+
+def _generate_orthographic_svgs(result, views=None, parallel=True, max_workers=None,
+                                svg_opts=None, digest=None):
+    """
+    [(title, svg)] for each requested view.
+
+    `result` is the imported shape/Workplane, or a zero-argument callable
+    returning it (only called when some view is missing from the cache).
+    With `digest` (the STEP file hash) every view is cached on disk under
+    (digest, direction, up, options), so adding a view only computes that view.
+    Hidden-line removal is CPU bound; with parallel=True the missing views
+    run in a process pool from a BRep copy of the shape.
+    """
+    views = _resolve_views(views)
+    opts = dict(SVG_OPTS, **(svg_opts or {}))
+    opts.pop("projectionDir", None)
+
+    svgs, missing = {}, []
+    for i, (title, direction, up) in enumerate(views):
+        path = SVG_CACHE.get(_view_key(digest, direction, up, opts)) if digest else None
+        if path:
+            with open(path, "r", encoding="utf-8") as f:
+                svgs[i] = f.read()
+        else:
+            missing.append(i)
+
+    if missing:
+        if callable(result):
+            result = result()
+        shape = result.val() if hasattr(result, "val") else result
+        jobs = [views[i] + (opts,) for i in missing]
+        rendered = _render_views(shape, jobs, parallel, max_workers)
+        for j, i in enumerate(missing):
+            title, direction, up = views[i]
+            svg = rendered[j]
+            if isinstance(svg, Exception):
+                svgs[i] = _error_svg(title, svg)
+                continue
+            svgs[i] = svg
+            if digest:
+                SVG_CACHE.put(_view_key(digest, direction, up, opts), svg.encode("utf-8"))
+
+    return [(view[0], svgs[i]) for i, view in enumerate(views)]
+
+
+def _optimize_views(svgs, precision, report=False):
+    out = []
+    last_svg_report.clear()
+    for title, svg in svgs:
+        small = optimize_svg(svg, precision)
+        before, after = len(svg.encode("utf-8")), len(small.encode("utf-8"))
+        last_svg_report.append({"view": title, "bytes_before": before, "bytes_after": after})
+        if report:
+            print("{}: {:,} -> {:,} bytes ({:.1f}% smaller)".format(
+                title, before, after, 100.0 * (before - after) / before if before else 0.0))
+        out.append((title, small))
+    return out
 
 
 def _latex_escape(text: str) -> str:
@@ -61,28 +230,12 @@ def _latex_escape(text: str) -> str:
 
 
 def _strip_background_rects(svg: str) -> str:
-    if not svg:
-        return svg
-    svg = re.sub(r"<\?xml[^>]*\?>", "", svg, flags=re.IGNORECASE).strip()
-    svg = re.sub(
-        r'<rect\b[^>]*(?:width\s*=\s*"[^\"]*"|height\s*=\s*"[^\"]*"|fill\s*=\s*"[^\"]*")[^>]*\/?>',
-        "",
-        svg,
-        flags=re.IGNORECASE,
-    )
-    svg = re.sub(r"</rect\s*>", "", svg, flags=re.IGNORECASE)
-    return svg
+    # single forward scan (see _svg.iter_clean_svg): no backtracking on multi-MB drawings
+    return clean_svg(svg)
 
 
-def _embed_audio_b64(filename="click_sound.mp3"):
-    if not os.path.exists(filename):
-        return None
-    try:
-        with open(filename, "rb") as f:
-            b64 = base64.b64encode(f.read()).decode("ascii")
-        return f"data:audio/mpeg;base64,{b64}"
-    except Exception:
-        return None
+def _embed_audio_b64(filename=None):
+    return click_sound_data_url(filename)
 
 
 def _make_client_side_html(svgs, audio_dataurl=None, logo_url=None, logo_max_h=40):
@@ -257,9 +410,15 @@ def _make_client_side_html(svgs, audio_dataurl=None, logo_url=None, logo_max_h=4
 
 def Step_Orthographic_Render(
     sketch_name_or_path,
-    audio_filename="click_sound.mp3",
+    audio_filename=None,
     logo_url="https://raw.githubusercontent.com/ArtemioA/AutoMindCloudExperimental/main/AutoMindCloud/AutoMindCloud.png",  # AutoMind badge (default)
     logo_max_height=40,
+    parallel=True,
+    views=None,
+    svg_opts=None,
+    use_cache=True,
+    svg_precision=None,
+    svg_report=False,
 ):
     """
     Render orthographic views panel with optional click sound and AutoMind logo.
@@ -268,12 +427,30 @@ def Step_Orthographic_Render(
     ----------
     sketch_name_or_path : str
         Path (or basename without .step) to a STEP file.
-    audio_filename : str
-        Local MP3 to embed and play on button clicks (optional).
+    audio_filename : str or None
+        Local MP3 to embed and play on button clicks. Defaults to the click
+        sound bundled with the package.
     logo_url : str or None
         URL to the AutoMind/logo image. If None, hides the badge.
     logo_max_height : int
         Max pixel height of the logo at bottom-right.
+    parallel : bool
+        Compute the views in a process pool (one process per view).
+    views : list or None
+        Views to show, in order. Each item is a name ("front", "back", "top",
+        "bottom", "right", "left", "iso"), a (title, (x, y, z)) pair or a
+        bare (x, y, z) direction pointing from the part towards the camera.
+        A (title, direction, up) triple also sets which way is up in the
+        drawing. Defaults to front, top, right and bottom.
+    svg_opts : dict or None
+        Extra cadquery getSVG options (showHidden, strokeWidth, width, ...).
+    use_cache : bool
+        Reuse views cached on disk for the same file contents, direction and options.
+    svg_precision : int or None
+        If set, round path coordinates to this many decimals and drop
+        collinear points and zero-length paths (see _svg.optimize_svg).
+    svg_report : bool
+        Print the bytes saved per view by svg_precision (also kept in last_svg_report).
     """
     if not sketch_name_or_path.lower().endswith(".step"):
         sketch_path = sketch_name_or_path + ".step"
@@ -283,8 +460,15 @@ def Step_Orthographic_Render(
     if not os.path.exists(sketch_path):
         raise FileNotFoundError(f"STEP file not found: {sketch_path}")
 
-    result = cq.importers.importStep(sketch_path)
-    svgs = _generate_orthographic_svgs(result)
+    svgs = _generate_orthographic_svgs(
+        lambda: _import_step(sketch_path),
+        views=views,
+        parallel=parallel,
+        svg_opts=svg_opts,
+        digest=file_digest(sketch_path) if use_cache else None,
+    )
+    if svg_precision is not None:
+        svgs = _optimize_views(svgs, svg_precision, svg_report)
     audio_dataurl = _embed_audio_b64(audio_filename)
     html_blob = _make_client_side_html(
         svgs,
@@ -292,12 +476,14 @@ def Step_Orthographic_Render(
         logo_url=logo_url,
         logo_max_h=logo_max_height,
     )
+    import ipywidgets as widgets
+
     return widgets.HTML(value=html_blob)
 
 
 def create_panel_from_step(
     sketch_name_or_path,
-    audio_filename="click_sound.mp3",
+    audio_filename=None,
     logo_url="https://i.gyazo.com/30a9ecbd8f1a0483a7e07a10eaaa8522.png",
     logo_max_height=40,
 ):
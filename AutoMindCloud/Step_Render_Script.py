@@ -1,85 +1,180 @@
-import sympy
-import gdown
-import cascadio
-import trimesh
 import base64
 from IPython.display import display, HTML
 import os
 
-def Download_Step(Drive_Link, Output_Name):
+from AutoMindCloud._cache import DiskCache, cache_root, file_digest
+from AutoMindCloud._shape_cache import SHAPE_CACHE
+from AutoMindCloud._workspace import find_input, scratch_file, workspace_path
+
+# Final scaled GLBs keyed by sha256(input bytes) + target_size.
+# GLB_CACHE.stats() reports hits/misses; GLB_CACHE.clear() empties it.
+GLB_CACHE = DiskCache(os.path.join(cache_root(), "glb"), max_bytes=2 << 30, suffix=".glb")
+
+# compress=True payloads (see _mesh_codec), under the same key as the GLB
+AMCM_CACHE = DiskCache(os.path.join(cache_root(), "amcm"), max_bytes=1 << 30, suffix=".amcm")
+
+def Download_Step(Drive_Link, Output_Name, checksum=None, force=False, workspace=None):
     """
     Downloads a STEP file from Google Drive using the full Drive link.
-    Saves it as Output_Name.step in /content.
+    Saves it as Output_Name.step in the workspace (`workspace`, else
+    _workspace.workspace_root(): /content on Colab) and returns its path.
+
+    The file comes from the shared download cache (see _download): it is
+    only downloaded again when Drive reports a change or it doesn't match
+    `checksum` ("sha256:<hex>" or "md5:<hex>"); force=True always downloads.
     """
-    root_dir = "/content"
-    file_id = Drive_Link.split('/d/')[1].split('/')[0]  # Extract ID from full link
-    url = f"https://drive.google.com/uc?id={file_id}"
-    output_step = os.path.join(root_dir, Output_Name + ".step")
-    gdown.download(url, output_step, quiet=True)
+    from AutoMindCloud import _download
+
+    output_step = workspace_path(Output_Name + ".step", workspace)
+    return _download.fetch(Drive_Link, output_step, checksum=checksum, force=force)["path"]
+
+def _scene_nbytes(scene):
+    return sum(g.vertices.nbytes + g.faces.nbytes for g in scene.geometry.values()
+               if hasattr(g, "faces"))
+
 
-def Step_Render(Step_Name, target_size=2.0, click_sound_path="/content/click_sound.mp3", background=0xffffff):
+def _load_scene(source):
     """
-    STEP/STL -> GLB -> scaled viewer (white UI) using MAX visible space.
-      - Keeps your buttons & badge.
-      - True full-viewport sizing (no unused whitespace).
-      - Robust fit using bounding sphere + FOV/Aspect (no cropping).
+    Load a STEP/STL file as a trimesh Scene (STEP goes through cascadio).
+    Parsed scenes are kept in SHAPE_CACHE; the caller gets its own copy.
     """
-    import base64, os, io
-    import trimesh
-    import cascadio
-    from IPython.display import display, HTML
+    scene = SHAPE_CACHE.get_or_load("trimesh", source, _parse_scene, sizeof=_scene_nbytes)
+    return scene.copy()
 
-    def _to_data_url_audio(file_path):
-        try:
-            if file_path and os.path.exists(file_path):
-                with open(file_path, "rb") as f:
-                    b64 = base64.b64encode(f.read()).decode("ascii")
-                return f"data:audio/mpeg;base64,{b64}"
-        except Exception:
-            pass
-        return None
 
-    output_step = Step_Name + ".step"
-    output_stl  = Step_Name + ".stl"
-    output_glb = Step_Name + ".glb"
-    output_glb_scaled = Step_Name + "_scaled.glb"
+def _parse_scene(source):
+    import trimesh
 
-    # --- Convert to GLB (supports STEP or STL) ---
-    if os.path.exists(output_step):
-        _ = cascadio.step_to_glb(output_step, output_glb)
-    elif os.path.exists(output_stl):
-        mesh = trimesh.load(output_stl)  # can be Trimesh or Scene
-        if isinstance(mesh, trimesh.Trimesh):
-            scene = trimesh.Scene(mesh)
-        else:
-            scene = mesh
-        scene.export(output_glb)  # trimesh can export .glb by extension
+    if source.lower().endswith((".step", ".stp")):
+        import cascadio
+
+        # cascadio only writes to a path: use a scratch GLB and drop it right away
+        with scratch_file(".glb") as tmp_glb:
+            cascadio.step_to_glb(source, tmp_glb)
+            loaded = trimesh.load(tmp_glb)
     else:
-        raise FileNotFoundError("Neither .step nor .stl found for '{}'".format(Step_Name))
+        loaded = trimesh.load(source)  # can be Trimesh or Scene
+    return loaded if isinstance(loaded, trimesh.Scene) else trimesh.Scene(loaded)
+
 
-    # --- Uniform scale to target_size ~ 2.0 ---
-    mesh = trimesh.load(output_glb)
+def _scaled_glb_bytes(source, target_size=2.0):
+    """Convert `source` once in memory, scale it uniformly to `target_size` and return GLB bytes."""
+    scene = _load_scene(source)
     try:
-        current_size = float(max(getattr(mesh, "extents", [1,1,1])))
+        current_size = float(max(scene.extents))
         if not current_size or current_size <= 0:
             current_size = 1.0
     except Exception:
         current_size = 1.0
-    scale = float(target_size)/float(current_size)
-    try:
-        mesh.apply_scale(scale)
-        mesh.export(output_glb_scaled)
-    except Exception:
-        scene = mesh if isinstance(mesh, trimesh.Scene) else trimesh.Scene(mesh)
-        scene.apply_scale(scale)
-        scene.export(output_glb_scaled)
+    scene.apply_scale(float(target_size)/float(current_size))
+    return scene.export(file_type="glb")
+
 
-    with open(output_glb_scaled, "rb") as f:
-        glb_base64 = base64.b64encode(f.read()).decode("ascii")
+def Step_To_GLB(source, output_path=None, target_size=2.0, use_cache=True, digest=None):
+    """
+    Conversion core of Step_Render, without any HTML: STEP/STL file ->
+    GLB bytes scaled so the largest extent is `target_size`.
 
-    click_data_url = _to_data_url_audio(click_sound_path)
+    use_cache: reuse/store the result in GLB_CACHE (keyed by the file's
+      sha256, or `digest` when the caller already has it, + target_size).
+    output_path: also write the GLB there.
+    """
+    glb_bytes = None
+    cache_key = None
+    if use_cache:
+        cache_key = "{}_{!r}".format(digest or file_digest(source), float(target_size))
+        cached = GLB_CACHE.get(cache_key)
+        if cached:
+            with open(cached, "rb") as f:
+                glb_bytes = f.read()
+
+    if glb_bytes is None:
+        # --- Convert + uniform scale in memory (single GLB export) ---
+        glb_bytes = _scaled_glb_bytes(source, target_size)
+        if use_cache:
+            GLB_CACHE.put(cache_key, glb_bytes)
+
+    if output_path:
+        with open(output_path, "wb") as f:
+            f.write(glb_bytes)
+    return glb_bytes
+
+
+def Step_Render(Step_Name, target_size=2.0, click_sound_path=None, background=0xffffff, use_cache=True,
+                save_glb=False, serve_assets=False, compress=False, offline=False):
+    """
+    STEP/STL -> GLB -> scaled viewer (white UI) using MAX visible space.
+      - Keeps your buttons & badge.
+      - True full-viewport sizing (no unused whitespace).
+      - Robust fit using bounding sphere + FOV/Aspect (no cropping).
+    Step_Name: <name>.step/.stp/.stl, with or without the extension, read in
+      place: as given, else inside the workspace (see _workspace).
+    click_sound_path: optional MP3 for UI clicks; defaults to the bundled sound.
+    use_cache: reuse the scaled GLB from GLB_CACHE when the input file and
+      target_size are unchanged.
+    save_glb: also write the scaled GLB to disk (True -> <Step_Name>_scaled.glb,
+      or a path). By default nothing is written next to the input.
+    serve_assets: serve the GLB from the local asset server (see _asset_server)
+      instead of inlining it as base64; falls back to inlining if it can't start.
+    compress: send the model as an AMCM container (see _mesh_codec: quantized
+      positions/normals, delta-varint indices) instead of the float32 GLB.
+    offline: load three.js and its loaders from the package's vendor folder
+      (see _viewer.script_tags) instead of the CDN; served by content hash
+      with serve_assets, else inlined.
+    """
+    import base64, os, io, json
+    from IPython.display import display, HTML
+    from AutoMindCloud._assets import click_sound_data_url
+    from AutoMindCloud import _viewer
+
+    source = find_input(Step_Name, (".step", ".stp", ".stl"))
+    if source is None:
+        raise FileNotFoundError("Neither .step nor .stl found for '{}'".format(Step_Name))
+    if Step_Name.lower().endswith((".step", ".stp", ".stl")):
+        Step_Name = os.path.splitext(Step_Name)[0]
+    output_glb_scaled = Step_Name + "_scaled.glb"
+
+    save_path = None
+    if save_glb:
+        save_path = save_glb if isinstance(save_glb, str) else output_glb_scaled
+    digest = file_digest(source) if use_cache else None
+    glb_bytes = Step_To_GLB(source, save_path, target_size=target_size, use_cache=use_cache, digest=digest)
+
+    payload, mesh_format = glb_bytes, "glb"
+    if compress:
+        amcm_key = "{}_{!r}".format(digest, float(target_size)) if digest else None
+        cached = AMCM_CACHE.get(amcm_key) if amcm_key else None
+        try:
+            if cached:
+                with open(cached, "rb") as f:
+                    payload = f.read()
+            else:
+                import trimesh
+                from AutoMindCloud._mesh_codec import encode_scene
+                payload = encode_scene(trimesh.load(io.BytesIO(glb_bytes), file_type="glb", force="scene"))
+                if amcm_key:
+                    AMCM_CACHE.put(amcm_key, payload)
+            mesh_format = "amcm"
+        except Exception:
+            payload, mesh_format = glb_bytes, "glb"
+
+    glb_url = server = None
+    if serve_assets:
+        try:
+            from AutoMindCloud._asset_server import get_asset_server
+            server = get_asset_server()
+            glb_url = server.publish_bytes(payload, os.path.basename(Step_Name) + "." + mesh_format)
+        except Exception:
+            glb_url = server = None
+    glb_url_js = "null" if glb_url is None else json.dumps(glb_url)
+    glb_base64 = "" if glb_url else base64.b64encode(payload).decode("ascii")
+    fmt_js = json.dumps(mesh_format)
+    amcm_js = _viewer.bundle("core/AMCM.js", script=True)[0] if mesh_format == "amcm" else ""
+
+    click_data_url = click_sound_data_url(click_sound_path)
     click_js = "null" if not click_data_url else f'"{click_data_url}"'
     bg_js = 'null' if (background is None) else str(int(background))
+    dep_tags = _viewer.script_tags(_viewer.STEP_SCRIPTS, offline=offline, server=server)
 
     html = f"""<!DOCTYPE html>
 <html lang="en">
@@ -135,9 +230,7 @@ def Step_Render(Step_Name, target_size=2.0, click_sound_path="/content/click_sou
   }})();
   </script>
 
-  <script src="https://cdn.jsdelivr.net/npm/three@0.132.2/build/three.min.js"></script>
-  <script src="https://cdn.jsdelivr.net/npm/three@0.132.2/examples/js/controls/OrbitControls.js"></script>
-  <script src="https://cdn.jsdelivr.net/npm/three@0.132.2/examples/js/loaders/GLTFLoader.js"></script>
+  {dep_tags}
   <script>
   (function(){{
     const THEME = {{
@@ -225,12 +318,28 @@ def Step_Render(Step_Name, target_size=2.0, click_sound_path="/content/click_sou
       const bin = atob(b64); const len = bin.length; const bytes = new Uint8Array(len);
       for (let i=0;i<len;i++) bytes[i]=bin.charCodeAt(i); return bytes.buffer;
     }}
+    const glbURL = {glb_url_js};   // out-of-band asset (null -> inline base64)
     const glbBase64 = "{glb_base64}";
-    const arrayBuffer = base64ToArrayBuffer(glbBase64);
+    const MESH_FORMAT = {fmt_js};  // 'glb' | 'amcm' (AutoMindCloud/_mesh_codec.py)
+
+    // AMCM decoder: parseAMCM/amcmGeometry from viewer/core/AMCM.js (empty for GLB payloads)
+    {amcm_js}
+    function amcmScene(bytes) {{
+      const group = new THREE.Group();
+      for (const part of parseAMCM(bytes)) {{
+        const c = part.color;
+        const mat = new THREE.MeshStandardMaterial({{
+          color: new THREE.Color(c[0]/255, c[1]/255, c[2]/255),
+          transparent: c[3] < 255, opacity: c[3]/255, roughness: 0.8, metalness: 0.1
+        }});
+        group.add(new THREE.Mesh(amcmGeometry(part), mat));
+      }}
+      return group;
+    }}
 
     let model = null;
     const loader = new THREE.GLTFLoader();
-    loader.parse(arrayBuffer, '', function(gltf) {{
+    function onGLTF(gltf) {{
       model = gltf.scene;
       model.traverse(n => {{
         if (n.isMesh && n.material) {{
@@ -241,7 +350,23 @@ def Step_Render(Step_Name, target_size=2.0, click_sound_path="/content/click_sou
       }});
       scene.add(model);
       centerAndFrame(1.12);
-    }}, function(err) {{ console.error('Error loading GLB:', err); }});
+    }}
+    function onGLTFError(err) {{ console.error('Error loading GLB:', err); }}
+    function loadModelBuffer(buf) {{
+      if (MESH_FORMAT === 'amcm') {{
+        try {{ onGLTF({{ scene: amcmScene(new Uint8Array(buf)) }}); }} catch (e) {{ onGLTFError(e); }}
+      }} else {{
+        loader.parse(buf, '', onGLTF, onGLTFError);
+      }}
+    }}
+    if (glbURL) {{
+      fetch(glbURL)
+        .then(r => {{ if (!r.ok) throw new Error('HTTP ' + r.status); return r.arrayBuffer(); }})
+        .then(loadModelBuffer)
+        .catch(onGLTFError);
+    }} else {{
+      loadModelBuffer(base64ToArrayBuffer(glbBase64));
+    }}
 
     // === Robust center & fit (bounding sphere + FOV/Aspect) ===
     let _lastMaxDim = 1;
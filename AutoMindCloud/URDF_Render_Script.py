@@ -1,33 +1,119 @@
 # urdf_render_fixed.py — Full-screen, always-fit viewer (Colab/Jupyter/VSCode)
-import base64, re, os, json, shutil, zipfile
+import base64, os, json, shutil, time
+from concurrent.futures import ThreadPoolExecutor
 from IPython.display import HTML
-import gdown
-
-def Download_URDF(Drive_Link, Output_Name="Model"):
-    root_dir = "/content"
-    file_id = Drive_Link.split('/d/')[1].split('/')[0]
-    url = f"https://drive.google.com/uc?id={file_id}"
-    zip_path = os.path.join(root_dir, Output_Name + ".zip")
-    tmp_extract = os.path.join(root_dir, f"__tmp_extract_{Output_Name}")
-    final_dir = os.path.join(root_dir, Output_Name)
-
-    if os.path.exists(tmp_extract): shutil.rmtree(tmp_extract)
-    os.makedirs(tmp_extract, exist_ok=True)
-    if os.path.exists(final_dir): shutil.rmtree(final_dir)
-
-    gdown.download(url, zip_path, quiet=True)
-    with zipfile.ZipFile(zip_path, 'r') as zf:
-        zf.extractall(tmp_extract)
-
-    def junk(n): return n.startswith('.') or n == '__MACOSX'
-    top = [n for n in os.listdir(tmp_extract) if not junk(n)]
-    if len(top) == 1 and os.path.isdir(os.path.join(tmp_extract, top[0])):
-        shutil.move(os.path.join(tmp_extract, top[0]), final_dir)
-    else:
-        os.makedirs(final_dir, exist_ok=True)
-        for n in top:
-            shutil.move(os.path.join(tmp_extract, n), os.path.join(final_dir, n))
-    shutil.rmtree(tmp_extract, ignore_errors=True)
+
+from AutoMindCloud import _urdf_index, _viewer
+from AutoMindCloud._cache import DiskCache, cache_root, file_digest
+from AutoMindCloud._workspace import find_dir, map_file, workspace_path
+
+# Simplified STL levels of detail keyed by sha256(mesh bytes) + face budget
+LOD_CACHE = DiskCache(os.path.join(cache_root(), "lod"), max_bytes=1 << 30, suffix=".stl")
+
+# STL meshes re-encoded in the compact AMCM container (see _mesh_codec)
+AMCM_CACHE = DiskCache(os.path.join(cache_root(), "amcm"), max_bytes=1 << 30, suffix=".amcm")
+
+# Seconds spent in each phase of the last URDF_Render call (scan/encode/assemble)
+last_timings = {}
+
+# Seconds and file counts of the last Download_URDF call (download/extract)
+last_download_timings = {}
+
+def _b64_file(path):
+    with map_file(path) as data:  # read in place, no intermediate copy
+        return base64.b64encode(data).decode("ascii")
+
+def _amcm_path(path, digest=None):
+    """Cached AMCM-encoded copy of an STL; the original path if it can't be encoded."""
+    try:
+        key = digest or file_digest(path)
+        cached = AMCM_CACHE.get(key)
+        if cached is None:
+            from AutoMindCloud._mesh_codec import encode_stl
+            cached = AMCM_CACHE.put(key, encode_stl(path))
+        return cached
+    except Exception:
+        return path
+
+def _lod_b64(path, max_faces, compress=False, digest=None):
+    """Base64 of a decimated copy of an STL with more than `max_faces` triangles, else None."""
+    try:
+        key = "{}_{}{}".format(digest or file_digest(path), int(max_faces), "_amcm" if compress else "")
+        cached = LOD_CACHE.get(key)
+        if cached is None:
+            import trimesh
+            mesh = trimesh.load(path, force="mesh")
+            if len(mesh.faces) <= max_faces:
+                LOD_CACHE.put(key, b"")  # empty entry: already under budget, no LOD
+                return None
+            try:
+                coarse = mesh.simplify_quadric_decimation(face_count=int(max_faces))
+            except TypeError:  # older trimesh: positional face count
+                coarse = mesh.simplify_quadric_decimation(int(max_faces))
+            if compress:
+                from AutoMindCloud._mesh_codec import encode_meshes
+                cached = LOD_CACHE.put(key, encode_meshes([coarse]))
+            else:
+                cached = LOD_CACHE.put(key, coarse.export(file_type="stl"))
+        if os.path.getsize(cached) == 0:
+            return None
+        return _b64_file(cached)
+    except Exception:
+        return None  # no LOD: the viewer loads the full mesh directly
+
+def _iter_json_object(keys, values):
+    """Yield the pieces of a JSON object {key: value} without building it in one string.
+    Values are base64 text, which never needs JSON escaping."""
+    yield "{"
+    for i, (k, v) in enumerate(zip(keys, values)):
+        yield (", " if i else "") + json.dumps(k) + ': "'
+        yield v
+        yield '"'
+    yield "}"
+
+def Download_URDF(Drive_Link, Output_Name="Model", checksum=None, force=False, robot_only=True,
+                  workers=None, verbose=True, workspace=None, keep_zip=False):
+    """
+    Download a zipped URDF package from Google Drive into <workspace>/<Output_Name>.
+
+    workspace defaults to _workspace.workspace_root() (/content on Colab);
+    an absolute Output_Name is used as is. The zip stays in the shared
+    download cache (_download.DOWNLOADS, one copy per machine) and is
+    extracted from there; keep_zip=True also links it as
+    <workspace>/<Output_Name>.zip. It is not downloaded again while it is
+    current: it matches `checksum`
+    ("sha256:<hex>" or "md5:<hex>") when given, else Drive reports the same
+    ETag/Last-Modified. An interrupted download resumes where it stopped.
+    robot_only=True extracts just the urdf/ and meshes/
+    trees (and package.xml); members are extracted in parallel by `workers`
+    threads and unchanged files are hard-linked from the previous
+    extraction (see _unzip). force=True downloads and extracts everything
+    again. verbose prints a timing summary (also kept in
+    last_download_timings).
+    """
+    from AutoMindCloud import _download, _unzip
+
+    final_dir = workspace_path(Output_Name, workspace)
+
+    t0 = time.perf_counter()
+    got = _download.DOWNLOADS.fetch(Drive_Link, checksum=checksum, force=force, quiet=not verbose)
+    if keep_zip:
+        _download.place(got["path"], final_dir + ".zip")
+    t1 = time.perf_counter()
+    if force:
+        shutil.rmtree(final_dir, ignore_errors=True)
+    stats = _unzip.extract(got["path"], final_dir, select=_unzip.robot_member if robot_only else None,
+                           workers=workers)
+    t2 = time.perf_counter()
+
+    last_download_timings.clear()
+    last_download_timings.update(download=t1 - t0, extract=t2 - t1, status=got["status"],
+                                 zip_bytes=got["bytes"], **stats)
+    if verbose:
+        print("Download_URDF: {} zip ({:.1f} MB) in {:.2f}s; extract {:.2f}s: {} extracted ({:.1f} MB), "
+              "{} reused, {} skipped -> {}".format(
+                  got["status"], got["bytes"] / 1e6, t1 - t0, t2 - t1, stats["extracted"],
+                  stats["bytes"] / 1e6, stats["reused"], stats["skipped"], final_dir))
     return final_dir
 
 
@@ -37,49 +123,70 @@ def URDF_Render(folder_path="Model",
                 # dynamic loader (repo/branch/file)
                 repo="ArtemioA/AutoMindCloud",
                 branch="main",
-                compFile="AutoMindCloud/viewer/urdf_viewer_main.js"):
-    """Render a full-screen URDF viewer. Output cell auto-fits any device."""
-
-    # ---- Find /urdf + /meshes and build mesh DB ----
-    def find_dirs(root):
-        u, m = os.path.join(root, "urdf"), os.path.join(root, "meshes")
-        if os.path.isdir(u) and os.path.isdir(m): return u, m
-        if os.path.isdir(root):
-            for name in os.listdir(root):
-                cand = os.path.join(root, name)
-                uu, mm = os.path.join(cand, "urdf"), os.path.join(cand, "meshes")
-                if os.path.isdir(uu) and os.path.isdir(mm): return uu, mm
-        return None, None
-
-    urdf_dir, meshes_dir = find_dirs(folder_path)
-    if not urdf_dir or not meshes_dir:
+                compFile="AutoMindCloud/viewer/urdf_viewer_main.js",
+                serve_assets=False,
+                asset_url=None,
+                workers=None,
+                timings=False,
+                lod_faces=None,
+                compress=False,
+                use_index=True,
+                collisions=False,
+                viewer="auto",
+                offline=False):
+    """Render a full-screen URDF viewer. Output cell auto-fits any device.
+
+    folder_path is used in place: as given, else inside the workspace
+    (see _workspace), so packages on shared or read-only storage are never
+    copied.
+
+    serve_assets=True serves meshes/textures from the local asset server
+    (see _asset_server) instead of base64-inlining them; asset_url overrides
+    the base URL the browser uses to reach it. Falls back to inlining if the
+    server can't start.
+
+    Mesh files are read and base64-encoded by a pool of `workers` threads and
+    the page is assembled in a single join. timings=True prints the time of
+    each phase (also kept in last_timings).
+
+    lod_faces=N ships, for every STL with more than N triangles, a decimated
+    copy (trimesh, cached in LOD_CACHE by content hash; meshes already under
+    the budget are remembered there too). With serve_assets=True the viewer
+    shows the coarse level first and swaps in the full mesh afterwards / on
+    demand. Inline pages can't fetch anything later, so they embed only the
+    coarse level of those meshes: a smaller page at reduced detail.
+
+    compress=True re-encodes STL meshes (and their LODs) as AMCM: quantized
+    positions plus delta/varint indices, typically 5-10x smaller than STL.
+    Encoded copies are cached in AMCM_CACHE.
+
+    use_index=True keeps a persistent index of the package (see _urdf_index):
+    later renders only re-stat files and re-read what changed.
+
+    Only the meshes referenced by <visual> elements are shipped (also those
+    of <collision> elements with collisions=True). .xacro files are expanded
+    and package:// paths resolved as described in _urdf_model.
+
+    viewer picks where the viewer JS comes from (see _viewer): "bundled"
+    uses the copy installed with the package (inlined, or served by hash
+    with serve_assets=True), "github" the latest commit of repo/branch,
+    looked up once per session and imported from a pinned, cacheable URL.
+    "auto" means bundled unless repo/branch/compFile were changed.
+
+    offline=True needs no network: three.js, its loaders and urdf-loader
+    come from the package's vendor folder as one minified script (see
+    _viewer.script_tags) and the viewer is the bundled copy. With
+    serve_assets=True both are served by content hash, so the browser
+    downloads them once per session; otherwise they are inlined.
+    """
+    t0 = time.perf_counter()
+
+    # ---- Find /urdf + /meshes (through the persistent package index) ----
+    index = _urdf_index.scan(find_dir(folder_path) or folder_path, use_index=use_index, collisions=collisions)
+    if index is None:
         return HTML(f"<b style='color:red'>No se encontró /urdf y /meshes en {folder_path}</b>")
-
-    urdf_files = [os.path.join(urdf_dir, f) for f in os.listdir(urdf_dir) if f.lower().endswith(".urdf")]
-    urdf_files.sort(key=lambda p: os.path.getsize(p) if os.path.exists(p) else 0, reverse=True)
-
-    urdf_raw = ""
-    mesh_refs = []
-    for upath in urdf_files:
-        try:
-            with open(upath, "r", encoding="utf-8", errors="ignore") as f:
-                txt = f.read().lstrip('\ufeff')
-            refs = re.findall(r'filename="([^"]+\.(?:stl|dae))"', txt, re.I)
-            if refs:
-                urdf_raw = txt
-                mesh_refs = list(dict.fromkeys(refs))
-                break
-        except Exception:
-            pass
-    if not urdf_raw and urdf_files:
-        with open(urdf_files[0], "r", encoding="utf-8", errors="ignore") as f:
-            urdf_raw = f.read().lstrip('\ufeff')
-
-    disk_files = []
-    for root, _, files in os.walk(meshes_dir):
-        for name in files:
-            if name.lower().endswith((".stl", ".dae", ".png", ".jpg", ".jpeg")):
-                disk_files.append(os.path.join(root, name))
+    urdf_raw, mesh_refs = index.urdf_text, index.mesh_refs
+    meshes_dir, disk_files = index.meshes_dir, index.disk_files
 
     meshes_root_abs = os.path.abspath(meshes_dir)
     by_rel, by_base = {}, {}
@@ -88,31 +195,65 @@ def URDF_Render(folder_path="Model",
         by_rel[rel] = p
         by_base[os.path.basename(p).lower()] = p
 
-    _cache, mesh_db = {}, {}
-    def b64(path):
-        if path not in _cache:
-            with open(path, "rb") as f:
-                _cache[path] = base64.b64encode(f.read()).decode("ascii")
-        return _cache[path]
+    server = None
+    if serve_assets:
+        try:
+            from AutoMindCloud._asset_server import get_asset_server
+            server = get_asset_server(public_url=asset_url)
+        except Exception:
+            server = None
+
+    # One blob (or URL) per file, stored under the first key seen for it;
+    # every other key for the same file is an alias -> that key.
+    blob_paths, mesh_urls, mesh_aliases, blob_ids = {}, {}, {}, {}
 
     def add_entry(key, path):
         k = key.replace("\\", "/").lower().lstrip("./")
         if k.startswith("package://"): k = k[len("package://"):]
-        if k not in mesh_db: mesh_db[k] = b64(path)
+        if k in blob_paths or k in mesh_aliases: return
+        blob_id = blob_ids.setdefault(path, k)
+        if blob_id != k: mesh_aliases[k] = blob_id
+        else: blob_paths[k] = path  # encoded/published below, in parallel
 
     for ref in mesh_refs:
         raw = ref.replace("\\", "/").lower().lstrip("./")
         pkg = raw[10:] if raw.startswith("package://") else raw
         bn = os.path.basename(raw).lower()
-        cand = by_rel.get(raw) or by_rel.get(pkg) or by_base.get(bn)
+        # resolved path first; loose match under meshes/ for broken references
+        cand = index.resolved.get(ref) or by_rel.get(raw) or by_rel.get(pkg) or by_base.get(bn)
         if cand:
             add_entry(raw, cand); add_entry(pkg, cand); add_entry(bn, cand)
 
     for p in disk_files:
         bn = os.path.basename(p).lower()
-        if bn.endswith((".png", ".jpg", ".jpeg")) and bn not in mesh_db:
+        if bn.endswith((".png", ".jpg", ".jpeg")):
             add_entry(bn, p)
 
+    t1 = time.perf_counter()
+    def source(k):  # file actually sent for blob key k
+        p = blob_paths[k]
+        return _amcm_path(p, index.digest(p)) if compress and k.endswith(".stl") else p
+
+    blob_keys, blobs, mesh_lod = list(blob_paths), [], {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        if lod_faces:
+            stl_keys = [k for k in blob_paths if k.endswith(".stl")]
+            lods = pool.map(lambda k: _lod_b64(blob_paths[k], lod_faces, compress,
+                                               index.digest(blob_paths[k])), stl_keys)
+            mesh_lod = {k: lod for k, lod in zip(stl_keys, lods) if lod}
+        if server is not None:
+            sources = list(pool.map(source, blob_keys))
+            for k, src in zip(blob_keys, sources):
+                mesh_urls[k] = server.publish_file(src, name=os.path.basename(blob_paths[k]))
+            blob_keys = []
+        else:
+            # an inline page can't fetch the full mesh later: ship only the LOD
+            blob_keys = [k for k in blob_keys if k not in mesh_lod]
+            blobs = list(pool.map(lambda k: _b64_file(source(k)), blob_keys))
+    if use_index:
+        index.save()  # keeps the mesh hashes computed above
+    t2 = time.perf_counter()
+
     # ---- HTML payload ----
     def esc(s: str) -> str:
         return (s.replace('\\','\\\\')
@@ -121,9 +262,16 @@ def URDF_Render(folder_path="Model",
                 .replace("</script>","<\\/script>"))
 
     urdf_js = esc(urdf_raw)            # escape once for backtick JS string
-    mesh_js = json.dumps(mesh_db)      # dict -> JS object
+    mesh_js = "\0MESH_DB\0"            # replaced by the streamed JSON object below
+    urls_js = json.dumps(mesh_urls)    # key -> URL (serve_assets)
+    alias_js = json.dumps(mesh_aliases) # key -> key holding the same file
+    lod_js  = json.dumps(mesh_lod)     # key -> base64 of the coarse STL
     bg_js   = 'null' if (background is None) else str(int(background))
     sel_js  = json.dumps(select_mode)
+    dep_tags = _viewer.script_tags(_viewer.URDF_SCRIPTS, offline=offline, server=server, defer=True)
+    mod_kind, mod_value = _viewer.module_source("bundled" if offline else viewer, repo, branch, compFile, server)
+    mod_url_js = json.dumps(mod_value if mod_kind == "url" else None)
+    mod_src_js = (json.dumps(mod_value) if mod_kind == "inline" else "null").replace("</", "<\\/")
 
     html = f"""<!doctype html>
 <html lang="en">
@@ -182,11 +330,7 @@ def URDF_Render(folder_path="Model",
 
 
 <!-- UMD deps -->
-<script defer src="https://cdn.jsdelivr.net/npm/three@0.132.2/build/three.min.js"></script>
-<script defer src="https://cdn.jsdelivr.net/npm/three@0.132.2/examples/js/controls/OrbitControls.js"></script>
-<script defer src="https://cdn.jsdelivr.net/npm/three@0.132.2/examples/js/loaders/STLLoader.js"></script>
-<script defer src="https://cdn.jsdelivr.net/npm/three@0.132.2/examples/js/loaders/ColladaLoader.js"></script>
-<script defer src="https://cdn.jsdelivr.net/npm/urdf-loader@0.12.6/umd/URDFLoader.js"></script>
+{dep_tags}
 
 <script type="module">
   // ---- Viewport + cell autosize helpers (Colab/Jupyter/VSCode) ----
@@ -215,22 +359,9 @@ def URDF_Render(folder_path="Model",
   // Nudge once after paint to avoid off-by-1 truncation in some embeds
   setTimeout(setColabFrameHeight, 50);
 
-  // ---- Latest commit loader (with branch fallback) ----
-  const repo = {json.dumps(repo)};
-  const branch = {json.dumps(branch)};
-  const compFile = {json.dumps(compFile)};
-
-  async function latest(){{
-    try {{
-      const api = 'https://api.github.com/repos/' + repo + '/commits/' + branch + '?_=' + Date.now();
-      const r = await fetch(api, {{ headers: {{ 'Accept':'application/vnd.github+json' }}, cache:'no-store' }});
-      if (!r.ok) throw 0;
-      const j = await r.json();
-      return (j.sha || '').slice(0, 7) || branch;
-    }} catch (_e) {{
-      return branch;
-    }}
-  }}
+  // ---- Viewer module: pinned URL or inline bundle (resolved in Python, see _viewer) ----
+  const VIEWER_URL = {mod_url_js};
+  const VIEWER_SRC = {mod_src_js};
 
   // Wait a tick so UMD globals are ready
   await new Promise(r => setTimeout(r, 50));
@@ -242,6 +373,9 @@ def URDF_Render(folder_path="Model",
     container: document.getElementById('app'),
     urdfContent: `{urdf_js}`,
     meshDB: {mesh_js},
+    meshURLs: {urls_js},
+    meshAliases: {alias_js},
+    meshLOD: {lod_js},
     selectMode: SELECT_MODE,
     background: BACKGROUND,
     // Hints your renderer can use (optional):
@@ -249,14 +383,11 @@ def URDF_Render(folder_path="Model",
     autoResize: true
   }};
 
-  // Import entry module from latest short SHA (fallback to branch)
   let mod = null;
   try {{
-    const ver = await latest();
-    const base = 'https://cdn.jsdelivr.net/gh/' + repo + '@' + ver + '/';
-    mod = await import(base + compFile + '?v=' + Date.now());
-  }} catch (_e) {{
-    mod = await import('https://cdn.jsdelivr.net/gh/' + repo + '@' + branch + '/' + compFile + '?v=' + Date.now());
+    mod = await import(VIEWER_URL || URL.createObjectURL(new Blob([VIEWER_SRC], {{ type: 'text/javascript' }})));
+  }} catch (e) {{
+    console.error('[URDF] Error al importar el visor', e);
   }}
 
   if (!mod || typeof mod.render !== 'function') {{
@@ -282,4 +413,16 @@ def URDF_Render(folder_path="Model",
 </body>
 </html>
 """
+    # Stitch the mesh JSON in without intermediate dict/json.dumps/f-string copies
+    head, tail = html.split(mesh_js)
+    html = "".join([head, *_iter_json_object(blob_keys, blobs), tail])
+    blobs = None
+    t3 = time.perf_counter()
+
+    last_timings.clear()
+    last_timings.update(scan=t1 - t0, encode=t2 - t1, assemble=t3 - t2, files=len(blob_keys),
+                        lods=len(mesh_lod))
+    if timings:
+        print("URDF_Render: scan {scan:.3f}s, encode {encode:.3f}s ({files} files), "
+              "assemble {assemble:.3f}s".format(**last_timings))
     return HTML(html)
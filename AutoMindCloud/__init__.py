@@ -1,16 +1,90 @@
-import IPython
+# Importing the package has no side effects: no network access and no output.
+# The click sound ships inside the package (see _assets.py) and the badge is
+# shown on request with Show_Badge().
+#
+# Renderers and the calculus API are loaded on first access (PEP 562), so
+# `AutoMindCloud.Step_Render` never imports sympy and `AutoMindCloud.E`
+# never imports cadquery/trimesh.
 
-from IPython.display import Image
+import importlib
 
-display(Image(url="https://i.gyazo.com/30a9ecbd8f1a0483a7e07a10eaaa8522.png"))
+# public name -> submodule that defines it
+_LAZY = {
+    "Step_Render": "Step_Render_Script",
+    "Download_Step": "Step_Render_Script",
+    "Step_To_GLB": "Step_Render_Script",
+    "Convert_Step_Batch": "Step_Batch_Script",
+    "URDF_Render": "URDF_Render_Script",
+    "Download_URDF": "URDF_Render_Script",
+    "Step_Orthographic_Render": "Step_Orthographic_Render_Script",
+    "Export_Orthographic_Batch": "Orthographic_Batch_Script",
+    "board": "Board_Script",
+    # Calculus API
+    "Inicializar": "Automatic_Evaluation_Script",
+    "S": "Automatic_Evaluation_Script",
+    "D": "Automatic_Evaluation_Script",
+    "E": "Automatic_Evaluation_Script",
+    "R": "Automatic_Evaluation_Script",
+    "DocumentoStr": "Automatic_Evaluation_Script",
+    "CalculusSummary": "Automatic_Evaluation_Script",
+    "RenderLatex": "Latemix2",
+}
 
-import requests
 
-url = "https://raw.githubusercontent.com/ArtemioA/AutoMindCloudExperimental/main/AutoMindCloud/click_sound.mp3"
-local_filename = "click_sound.mp3"
+def __getattr__(name):
+    modname = _LAZY.get(name)
+    if modname is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module("." + modname, __name__), name)
+    globals()[name] = value  # next access skips __getattr__
+    return value
 
-response = requests.get(url)
-if response.status_code == 200:
-    with open(local_filename, "wb") as f:
-        f.write(response.content)
 
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
+def Show_Badge():
+    """Display the AutoMindCloud badge in the current notebook output."""
+    from IPython.display import Image, display
+    from AutoMindCloud._assets import BADGE_URL
+
+    display(Image(url=BADGE_URL))
+
+
+def Set_Workspace(path=None):
+    """
+    Folder the downloads and board snapshots go to (default: /content on
+    Colab, else the current directory; see _workspace). None resets it.
+    Returns the folder in use.
+    """
+    from AutoMindCloud._workspace import set_workspace
+
+    return set_workspace(path)
+
+
+def Import_Report():
+    """
+    Measure the cold import cost of each entry point.
+
+    Every submodule is imported in a fresh interpreter so earlier imports do
+    not hide its dependencies. Returns {module: seconds}, or the error text
+    when a dependency is missing.
+    """
+    import subprocess
+    import sys
+
+    code = (
+        "import time, importlib; t = time.perf_counter(); "
+        "importlib.import_module('AutoMindCloud.' + {!r}); "
+        "print(time.perf_counter() - t)"
+    )
+    report = {}
+    for modname in sorted(set(_LAZY.values())):
+        proc = subprocess.run([sys.executable, "-c", code.format(modname)],
+                              capture_output=True, text=True)
+        if proc.returncode == 0:
+            report[modname] = float(proc.stdout.strip().splitlines()[-1])
+        else:
+            report[modname] = (proc.stderr.strip().splitlines() or ["error"])[-1]
+    return report
@@ -0,0 +1,197 @@
+"""
+Local asset server for the 3D viewers.
+
+Instead of base64-inlining GLB/STL/DAE files into the notebook output, the
+renderers can publish them here and hand the viewer a URL. The server is a
+stdlib ThreadingHTTPServer on 127.0.0.1 running in a daemon thread, started
+on first use. It supports HEAD, single HTTP ranges, ETag/If-None-Match and
+long-lived Cache-Control headers (asset URLs are content-addressed, so they
+never change meaning).
+
+The browser must be able to reach the kernel's localhost. That holds for a
+local Jupyter. In Colab the port is exposed through
+google.colab.kernel.proxyPort. Anywhere else (remote Jupyter through
+jupyter-server-proxy, SSH tunnels, ...) set $AUTOMINDCLOUD_ASSET_URL or
+pass public_url= to the base URL that reaches the port.
+
+Published buffers are not kept in memory: publish_bytes() writes them once
+to ASSET_CACHE (a size-bounded DiskCache keyed by content hash) and they
+are served from disk like published files. An asset evicted from there
+answers 404 until it is published again.
+"""
+
+import os
+import re
+import hashlib
+import mimetypes
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote
+
+from AutoMindCloud._cache import DiskCache, cache_root
+
+ASSET_URL_ENV = "AUTOMINDCLOUD_ASSET_URL"
+
+MIME = {
+    ".glb": "model/gltf-binary",
+    ".stl": "model/stl",
+    ".dae": "model/vnd.collada+xml",
+    ".js": "text/javascript",
+    ".mp3": "audio/mpeg",
+}
+
+# Bytes handed to publish_bytes(), served from disk
+ASSET_CACHE = DiskCache(os.path.join(cache_root(), "assets"), max_bytes=1 << 30)
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_CHUNK = 1 << 20
+
+
+def _mime_for(name):
+    ext = os.path.splitext(name)[1].lower()
+    return MIME.get(ext) or mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "AutoMindCloudAssets/1.0"
+
+    def log_message(self, *args):  # keep notebook output clean
+        pass
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self._cors()
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._serve(head=True)
+
+    def do_GET(self):
+        self._serve(head=False)
+
+    def _cors(self):
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Headers", "Range, If-None-Match")
+        self.send_header("Access-Control-Expose-Headers", "Content-Length, Content-Range, ETag, Accept-Ranges")
+
+    def _serve(self, head):
+        parts = self.path.split("?", 1)[0].strip("/").split("/")
+        entry = self.server.registry.get(unquote(parts[1])) if len(parts) >= 2 and parts[0] == "a" else None
+        if entry is None or not os.path.isfile(entry[1]):
+            self.send_response(404)
+            self._cors()
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        asset_id, source, mime, size = entry
+        etag = '"%s"' % asset_id
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self._cors()
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        start, end = 0, size - 1
+        status = 200
+        rng = self.headers.get("Range")
+        if rng:
+            m = _RANGE_RE.match(rng.strip())
+            if m and (m.group(1) or m.group(2)):
+                if m.group(1):
+                    start = int(m.group(1))
+                    end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+                else:  # suffix range: last N bytes
+                    start = max(0, size - int(m.group(2)))
+                if start > end or start >= size:
+                    self.send_response(416)
+                    self._cors()
+                    self.send_header("Content-Range", "bytes */%d" % size)
+                    self.end_headers()
+                    return
+                status = 206
+
+        length = end - start + 1 if size else 0
+        self.send_response(status)
+        self._cors()
+        self.send_header("Content-Type", mime)
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        if status == 206:
+            self.send_header("Content-Range", "bytes %d-%d/%d" % (start, end, size))
+        self.end_headers()
+        if head or not length:
+            return
+
+        try:
+            with open(source, "rb") as f:
+                f.seek(start)
+                remaining = length
+                while remaining > 0:
+                    block = f.read(min(_CHUNK, remaining))
+                    if not block:
+                        break
+                    self.wfile.write(block)
+                    remaining -= len(block)
+        except (BrokenPipeError, ConnectionResetError, FileNotFoundError):
+            pass
+
+
+class AssetServer:
+    """Background HTTP server publishing buffers and files by content-addressed URL."""
+
+    def __init__(self, host="127.0.0.1", port=0, public_url=None):
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.registry = {}
+        self.host, self.port = self._httpd.server_address[:2]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="AutoMindCloudAssets", daemon=True)
+        self._thread.start()
+        self.base_url = (public_url or os.environ.get(ASSET_URL_ENV) or self._default_base_url()).rstrip("/") + "/"
+
+    def _default_base_url(self):
+        try:
+            from google.colab.output import eval_js
+            return eval_js("google.colab.kernel.proxyPort(%d, {'cache': true})" % self.port)
+        except Exception:
+            return "http://%s:%d/" % (self.host, self.port)
+
+    def _register(self, asset_id, source, name, mime, size):
+        self._httpd.registry[asset_id] = (asset_id, source, mime or _mime_for(name), size)
+        return self.base_url + "a/" + quote(asset_id) + "/" + quote(os.path.basename(name))
+
+    def publish_bytes(self, data, name, mime=None):
+        """Serve `data` (bytes) and return its URL; the bytes are spilled to ASSET_CACHE."""
+        asset_id = hashlib.sha256(data).hexdigest()[:32]
+        path = ASSET_CACHE.get(asset_id) or ASSET_CACHE.put(asset_id, data)
+        return self._register(asset_id, path, name, mime, os.path.getsize(path))
+
+    def publish_file(self, path, name=None, mime=None):
+        """Serve a file straight from disk (never loaded whole into memory) and return its URL."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        key = "%s|%d|%d" % (path, st.st_mtime_ns, st.st_size)
+        asset_id = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+        return self._register(asset_id, path, name or path, mime, st.st_size)
+
+    def shutdown(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+_SERVER = None
+_SERVER_LOCK = threading.Lock()
+
+
+def get_asset_server(public_url=None):
+    """Return the session's AssetServer, starting it on first call."""
+    global _SERVER
+    with _SERVER_LOCK:
+        if _SERVER is None:
+            _SERVER = AssetServer(public_url=public_url)
+        elif public_url:
+            _SERVER.base_url = public_url.rstrip("/") + "/"
+        return _SERVER
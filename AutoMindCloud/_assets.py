@@ -0,0 +1,47 @@
+"""
+Assets bundled inside the AutoMindCloud package (click sound, badge).
+
+Nothing here touches the network or the notebook at import time: files are
+read from the installed package the first time a renderer asks for them and
+the encoded result is kept for the rest of the session.
+"""
+
+import os
+import base64
+
+_PKG_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CLICK_SOUND_PATH = os.path.join(_PKG_DIR, "click_sound.mp3")
+BADGE_URL = "https://i.gyazo.com/30a9ecbd8f1a0483a7e07a10eaaa8522.png"
+
+_DATA_URLS = {}  # (path, mtime_ns, size) -> data URL
+
+
+def _data_url(path, mime):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (path, st.st_mtime_ns, st.st_size)
+    if key not in _DATA_URLS:
+        try:
+            with open(path, "rb") as f:
+                b64 = base64.b64encode(f.read()).decode("ascii")
+        except OSError:
+            return None
+        _DATA_URLS[key] = f"data:{mime};base64,{b64}"
+    return _DATA_URLS[key]
+
+
+def click_sound_data_url(path=None):
+    """
+    data:audio/mpeg URL for the click sound.
+
+    Uses `path` when it points to an existing file, otherwise the copy bundled
+    with the package. Returns None if no sound can be read.
+    """
+    if path and os.path.exists(path):
+        url = _data_url(path, "audio/mpeg")
+        if url:
+            return url
+    return _data_url(CLICK_SOUND_PATH, "audio/mpeg")
@@ -0,0 +1,114 @@
+"""
+Helpers shared by the headless batch tools (Orthographic_Batch_Script,
+Step_Batch_Script): input expansion, per-input output names, the JSON
+manifest that makes runs incremental, and the timings CSV.
+"""
+
+import os
+import csv
+import glob
+import json
+import tempfile
+
+MANIFEST_NAME = "manifest.json"
+TIMINGS_NAME = "timings.csv"
+STEP_EXTS = (".step", ".stp")
+
+
+def expand_inputs(inputs, exts=STEP_EXTS):
+    """Files from folders (searched recursively), glob patterns and plain paths, sorted and unique."""
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    found = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, names in os.walk(item):
+                found += [os.path.join(root, n) for n in names if n.lower().endswith(exts)]
+        elif glob.has_magic(item):
+            found += [p for p in glob.glob(item, recursive=True) if p.lower().endswith(exts)]
+        elif os.path.isfile(item):
+            found.append(item)
+        else:
+            raise FileNotFoundError(f"Input not found: {item}")
+    return sorted(set(os.path.abspath(p) for p in found))
+
+
+def slug(text):
+    return "".join(c if c.isalnum() else "_" for c in text.lower()).strip("_") or "item"
+
+
+def output_names(paths):
+    """{path: name} from each file name, made unique when two inputs share it."""
+    names, used = {}, set()
+    for p in paths:
+        base = slug(os.path.splitext(os.path.basename(p))[0])
+        k, name = 1, base
+        while name in used:
+            k += 1
+            name = f"{base}_{k}"
+        used.add(name)
+        names[p] = name
+    return names
+
+
+def write_atomic(path, data):
+    """Write bytes or text to `path` through a temp file in the same folder."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data.encode("utf-8") if isinstance(data, str) else data)
+        os.chmod(tmp, 0o644)  # mkstemp files are private
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def load_manifest(out_dir, options):
+    """Previous {path: entry} from out_dir's manifest, or {} if missing or made with other options."""
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest.get("files", {}) if manifest.get("options") == options else {}
+
+
+def is_current(entry, digest):
+    """True when a manifest entry was made from `digest` without errors and its outputs still exist."""
+    return bool(entry and entry.get("sha256") == digest and not entry.get("error")
+                and all(os.path.exists(o) for o in entry.get("outputs", [])))
+
+
+def save_run(out_dir, options, paths, files):
+    """Write the manifest and the timings CSV of a run."""
+    manifest = {"options": options, "files": files}
+    write_atomic(os.path.join(out_dir, MANIFEST_NAME), json.dumps(manifest, indent=1))
+    with open(os.path.join(out_dir, TIMINGS_NAME), "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["file", "status", "seconds", "outputs"])
+        for p in paths:
+            e = files[p]
+            w.writerow([p, status(e), "" if e.get("skipped") else e.get("seconds"), len(e.get("outputs", []))])
+    return manifest
+
+
+def status(entry):
+    return "skipped" if entry.get("skipped") else ("error" if entry.get("error") else "done")
+
+
+def print_summary(paths, files, wall, out_dir):
+    for p in paths:
+        e = files[p]
+        if e.get("skipped"):
+            print(f"  skipped   {p}")
+        elif e.get("error"):
+            print(f"  error     {p}: {e['error']}")
+        else:
+            print(f"  {e['seconds']:7.2f}s  {p}")
+    counts = [status(files[p]) for p in paths]
+    print(f"{counts.count('done')} done, {counts.count('skipped')} unchanged, "
+          f"{counts.count('error')} failed in {wall:.2f}s -> {out_dir}")
@@ -0,0 +1,136 @@
+"""
+Content-addressed on-disk cache shared by the renderers.
+
+Entries are plain files named after a key (usually a SHA-256 of the input
+bytes plus the options that affect the output). Reads refresh the file's
+mtime, so evicting the oldest mtimes first gives a size-bounded LRU.
+Nothing is created on disk until the first write.
+"""
+
+import os
+import hashlib
+import tempfile
+import threading
+
+CACHE_ENV = "AUTOMINDCLOUD_CACHE"
+
+
+def cache_root():
+    """Root folder for every AutoMindCloud cache ($AUTOMINDCLOUD_CACHE or ~/.cache/AutoMindCloud)."""
+    root = os.environ.get(CACHE_ENV)
+    if not root:
+        root = os.path.join(os.path.expanduser("~"), ".cache", "AutoMindCloud")
+    return root
+
+
+def file_digest(path, algo="sha256"):
+    """Hex digest of a file (SHA-256 by default), hashed through a read-only mmap."""
+    from AutoMindCloud._workspace import map_file
+
+    h = hashlib.new(algo)
+    with map_file(path) as data:
+        h.update(data)
+    return h.hexdigest()
+
+
+class DiskCache:
+    """
+    Size-bounded LRU cache of files in `directory`.
+
+    get(key) returns the cached file path (or None) and put(key, data) stores
+    bytes atomically. Hit/miss counters are kept for the current session.
+    """
+
+    def __init__(self, directory, max_bytes=2 << 30, suffix=""):
+        self.directory = directory
+        self.max_bytes = int(max_bytes)
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key):
+        path = self.path_for(key)
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def put(self, key, data):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        self.evict(keep=path)
+        return path
+
+    def _entries(self):
+        out = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return out
+        for name in names:
+            if not name.endswith(self.suffix) or name.endswith(".tmp"):
+                continue
+            p = os.path.join(self.directory, name)
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            out.append((st.st_mtime, st.st_size, p))
+        return out
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, p in entries:
+                if total <= self.max_bytes:
+                    break
+                if p == keep:
+                    continue
+                try:
+                    os.remove(p)
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+
+    def clear(self):
+        for _, _, p in self._entries():
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+    def stats(self):
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "directory": self.directory,
+        }
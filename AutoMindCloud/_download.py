@@ -0,0 +1,259 @@
+"""
+Google Drive downloads shared by Download_URDF / Download_Step.
+
+DOWNLOADS (a DownloadManager) keeps every downloaded file once, in a
+content-addressed, size-bounded cache under cache_root()/downloads:
+
+- objects/<sha256>: the files themselves (a DiskCache, LRU eviction);
+- ids/<drive id>.json: which object a Drive file id resolved to, with the
+  server's validators (ETag, Last-Modified, size) at download time;
+- partial/<drive id>: an interrupted download, resumed by the next fetch.
+
+A fetch reuses the cached object, without downloading, when:
+
+- an expected `checksum` is given and the object matches it, or
+- a one-byte ranged request to Drive returns the same ETag (or the same
+  size and Last-Modified) as recorded;
+- Drive can't be reached at all.
+
+Without a checksum, a file Drive gives no validators for is downloaded
+again every time. Requests for the same id are serialized across threads
+and, with `filelock` (installed with gdown), across processes, so
+notebooks on one machine download a file once. Different ids download in
+parallel (fetch_many / submit). Callers get the object hard-linked to
+their path (copied across filesystems), so no second copy is stored.
+"""
+
+import os
+import json
+import time
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from AutoMindCloud._cache import DiskCache, cache_root, file_digest
+
+_DIRECT_URL = "https://drive.usercontent.google.com/download?id={}&export=download&confirm=t"
+
+
+def drive_file_id(link):
+    """File id from a Drive share link (/d/<id>/..., ?id=<id>) or a bare id."""
+    link = link.strip()
+    if "/d/" in link:
+        return link.split("/d/")[1].split("/")[0]
+    if "id=" in link:
+        return link.split("id=")[1].split("&")[0]
+    return link
+
+
+def drive_url(file_id):
+    return f"https://drive.google.com/uc?id={file_id}"
+
+
+def _parse_checksum(checksum):
+    """("sha256" | "md5", hex) from "sha256:<hex>", "md5:<hex>" or a bare hex digest."""
+    algo, _, value = checksum.rpartition(":")
+    value = value.strip().lower()
+    return (algo.lower() or ("md5" if len(value) == 32 else "sha256")), value
+
+
+def remote_validators(file_id, timeout=10):
+    """
+    {"etag", "last_modified", "size"} of a Drive file from a one-byte ranged
+    GET (no body download); {} when Drive answers without usable
+    validators (e.g. an HTML page), None when it can't be reached.
+    """
+    try:
+        import requests
+
+        r = requests.get(_DIRECT_URL.format(file_id), headers={"Range": "bytes=0-0"},
+                         stream=True, timeout=timeout)
+        r.close()
+    except Exception:
+        return None
+    if r.status_code not in (200, 206) or "text/html" in r.headers.get("Content-Type", ""):
+        return {}
+    size = r.headers.get("Content-Range", "").rpartition("/")[2]
+    return {
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "size": int(size) if size.isdigit() else None,
+    }
+
+
+def _same_remote(old, new):
+    if not old or not new:
+        return False
+    if old.get("etag") and new.get("etag"):
+        return old["etag"] == new["etag"]
+    return (new.get("size") is not None and old.get("size") == new.get("size")
+            and bool(new.get("last_modified")) and old.get("last_modified") == new.get("last_modified"))
+
+
+def _gdown(url, output, quiet):
+    import gdown
+
+    try:  # gdown >= 4.7: continue a partial download left in output's folder
+        return gdown.download(url, output, quiet=quiet, resume=True)
+    except TypeError:
+        return gdown.download(url, output, quiet=quiet)
+
+
+class _FileLock:
+    """filelock.FileLock when available, else a no-op (threads are still serialized)."""
+
+    def __init__(self, path):
+        try:
+            from filelock import FileLock
+
+            self._lock = FileLock(path)
+        except ImportError:
+            self._lock = None
+
+    def __enter__(self):
+        if self._lock is not None:
+            self._lock.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        if self._lock is not None:
+            self._lock.release()
+
+
+class DownloadManager:
+    """Content-addressed cache of Drive downloads (see module docstring)."""
+
+    def __init__(self, root=None, max_bytes=8 << 30, max_workers=4):
+        self.root = root or os.path.join(cache_root(), "downloads")
+        self.objects = DiskCache(os.path.join(self.root, "objects"), max_bytes=max_bytes)
+        self.max_workers = max_workers
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _id_lock(self, file_id):
+        with self._lock:
+            return self._locks.setdefault(file_id, threading.Lock())
+
+    def _pointer_path(self, file_id):
+        return os.path.join(self.root, "ids", file_id + ".json")
+
+    def _load_pointer(self, file_id):
+        try:
+            with open(self._pointer_path(file_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_pointer(self, file_id, pointer):
+        path = self._pointer_path(file_id)
+        tmp = path + ".tmp%d" % os.getpid()
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(pointer, f)
+        os.replace(tmp, path)
+
+    def _cached(self, file_id, checksum):
+        """(object path, pointer) when the cached object is current, else (None, pointer)."""
+        pointer = self._load_pointer(file_id)
+        obj = self.objects.get(pointer["sha256"]) if pointer else None
+        if obj is None or os.path.getsize(obj) != pointer.get("size"):
+            return None, pointer
+        if checksum:
+            algo, value = _parse_checksum(checksum)
+            if algo not in pointer:
+                pointer[algo] = file_digest(obj, algo)
+                self._save_pointer(file_id, pointer)
+            return (obj if pointer[algo] == value else None), pointer
+        remote = remote_validators(file_id)
+        # remote None: Drive unreachable, the cached copy is the best we have
+        if remote is None or _same_remote(pointer.get("remote"), remote):
+            return obj, pointer
+        return None, dict(pointer, remote=remote)
+
+    def fetch(self, link, checksum=None, force=False, quiet=True):
+        """
+        Cached object for a Drive link, downloading it when needed.
+        Returns {"id", "path", "sha256", "status": "cached" | "downloaded",
+        "seconds", "bytes"}. Raises ValueError on a checksum mismatch.
+        """
+        t0 = time.perf_counter()
+        file_id = drive_file_id(link)
+        for d in ("ids", "partial"):
+            os.makedirs(os.path.join(self.root, d), exist_ok=True)
+
+        with self._id_lock(file_id), _FileLock(self._pointer_path(file_id) + ".lock"):
+            obj, pointer = (None, None) if force else self._cached(file_id, checksum)
+            status = "cached"
+            if obj is None:
+                status = "downloaded"
+                staging = os.path.join(self.root, "partial", file_id)
+                if _gdown(drive_url(file_id), staging, quiet) is None:
+                    raise RuntimeError(f"Download failed for Drive file {file_id}")
+                digest = file_digest(staging)
+                pointer = {"sha256": digest, "size": os.path.getsize(staging),
+                           "remote": (pointer or {}).get("remote") or remote_validators(file_id)}
+                if checksum:
+                    algo, value = _parse_checksum(checksum)
+                    pointer[algo] = digest if algo == "sha256" else file_digest(staging, algo)
+                    if pointer[algo] != value:
+                        os.remove(staging)
+                        raise ValueError(f"Checksum mismatch for Drive file {file_id}: "
+                                         f"expected {algo} {value}, got {pointer[algo]}")
+                obj = self.objects.path_for(digest)
+                os.makedirs(self.objects.directory, exist_ok=True)
+                os.replace(staging, obj)
+                os.chmod(obj, 0o444)  # shared through hard links: never edited in place
+                self.objects.evict(keep=obj)
+                self._save_pointer(file_id, pointer)
+
+        return {"id": file_id, "path": obj, "sha256": pointer["sha256"], "status": status,
+                "seconds": time.perf_counter() - t0, "bytes": pointer["size"]}
+
+    def submit(self, link, **kwargs):
+        """fetch() in the manager's thread pool; returns a Future."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="AutoMindCloudDownloads")
+        return self._pool.submit(self.fetch, link, **kwargs)
+
+    def fetch_many(self, links, **kwargs):
+        """fetch() several links at once; results in the order of `links`."""
+        return [f.result() for f in [self.submit(link, **kwargs) for link in links]]
+
+    def stats(self):
+        return self.objects.stats()
+
+    def clear(self):
+        self.objects.clear()
+        shutil.rmtree(os.path.join(self.root, "ids"), ignore_errors=True)
+
+
+DOWNLOADS = DownloadManager()
+
+
+def place(src, dest):
+    """Make `dest` the file `src` (hard link, or a copy across filesystems)."""
+    try:
+        if os.path.samefile(src, dest):
+            return dest
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+    tmp = dest + ".tmp%d" % os.getpid()
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dest)
+    return dest
+
+
+def fetch(link, path, checksum=None, force=False, quiet=True):
+    """
+    DOWNLOADS.fetch() placed at `path`. Returns {"path", "status", "seconds",
+    "bytes", "sha256"}.
+    """
+    got = DOWNLOADS.fetch(link, checksum=checksum, force=force, quiet=quiet)
+    place(got["path"], path)
+    return dict(got, path=path)
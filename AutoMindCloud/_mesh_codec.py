@@ -0,0 +1,216 @@
+"""
+Compact binary mesh container ("AMCM") for the viewer payloads.
+
+Positions are quantized to uint16 inside each mesh's bounding box and
+normals, when present, are octahedron-encoded into two int8. Identical
+vertices are merged so the mesh becomes indexed, and the index buffer is
+delta + zigzag + varint (LEB128) encoded. STL files carry only flat facet
+normals, so they are sent without normals (the viewer recomputes the same
+flat normals); a binary STL (50 bytes per triangle) typically shrinks 5-10x.
+The browser decoder is viewer/core/AMCM.js (imported by the URDF viewer,
+inlined by Step_Render); decode() is the Python counterpart.
+
+The mesh count is a u16: past MAX_MESHES meshes, encode_meshes() merges
+meshes of the same color (and, if still too many, neighbouring ones).
+
+Layout (little endian):
+    b"AMCM", u8 version, u8 flags (bit0: normals), u16 mesh count
+    per mesh:
+        u32 vertex count, u32 index count, u32 index byte length
+        u8[4] RGBA, f32[3] bbox min, f32[3] bbox span
+        u16[3 * V] positions, [i8[2 * V] normals], u8[...] indices,
+        zero padding to a multiple of 4 bytes
+"""
+
+import struct
+
+MAGIC = b"AMCM"
+VERSION = 1
+FLAG_NORMALS = 1
+
+MAX_MESHES = 0xFFFF
+
+_HEADER = struct.Struct("<4sBBH")
+_MESH_HEADER = struct.Struct("<III4B3f3f")
+
+
+def _oct_encode(n):
+    import numpy as np
+
+    n = n / np.maximum(np.abs(n).sum(axis=1, keepdims=True), 1e-12)
+    x, y, z = n[:, 0], n[:, 1], n[:, 2]
+    neg = z < 0
+    ox = np.where(neg, (1.0 - np.abs(y)) * np.sign(x + (x == 0)), x)
+    oy = np.where(neg, (1.0 - np.abs(x)) * np.sign(y + (y == 0)), y)
+    return np.round(np.stack([ox, oy], axis=1) * 127.0).astype(np.int8)
+
+
+def _varint_deltas(indices):
+    """Delta + zigzag + LEB128 encode an index buffer (vectorized)."""
+    import numpy as np
+
+    d = np.diff(indices.astype(np.int64), prepend=0)
+    z = ((d << 1) ^ (d >> 63)).astype(np.uint64)
+    nbytes = np.ones(len(z), dtype=np.int64)
+    for k in range(1, 10):
+        nbytes += z >= (1 << (7 * k))
+    out = np.empty(int(nbytes.sum()), dtype=np.uint8)
+    offsets = np.cumsum(nbytes) - nbytes
+    for k in range(int(nbytes.max()) if len(z) else 0):
+        m = nbytes > k
+        byte = (z[m] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        cont = (nbytes[m] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[offsets[m] + k] = (byte | cont).astype(np.uint8)
+    return out.tobytes()
+
+
+def _encode_one(triangles, corner_normals, rgba):
+    import numpy as np
+
+    normals = corner_normals is not None
+    pos = np.asarray(triangles, dtype=np.float64).reshape(-1, 3)
+    lo = pos.min(axis=0) if len(pos) else np.zeros(3)
+    span = (pos.max(axis=0) - lo) if len(pos) else np.ones(3)
+    span = np.where(span > 0, span, 1.0)
+    q = np.round((pos - lo) / span * 65535.0).astype("<u2")
+
+    parts = [q.view(np.uint8).reshape(-1, 6)]
+    if normals:
+        nrm = np.asarray(corner_normals, dtype=np.float64).reshape(-1, 3)
+        parts.append(_oct_encode(nrm).view(np.uint8).reshape(-1, 2))
+    verts = np.ascontiguousarray(np.hstack(parts))
+    stride = verts.shape[1]
+
+    # Merge identical vertices, numbered by first appearance (small index deltas)
+    keys = verts.view("V%d" % stride).ravel()
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    remap = np.empty_like(order)
+    remap[order] = np.arange(len(order))
+    indices = remap[inverse.ravel()]
+    uniq = verts[first[order]]
+
+    idx_bytes = _varint_deltas(indices)
+    body = [np.ascontiguousarray(uniq[:, :6]).tobytes()]
+    if normals:
+        body.append(np.ascontiguousarray(uniq[:, 6:8]).tobytes())
+    body.append(idx_bytes)
+    data = b"".join(body)
+    data += b"\0" * (-len(data) % 4)
+    header = _MESH_HEADER.pack(len(uniq), len(indices), len(idx_bytes),
+                               *[int(c) for c in rgba], *lo.tolist(), *span.tolist())
+    return header + data
+
+
+def _merge_parts(parts):
+    """At most MAX_MESHES (triangles, corner normals, rgba) parts: same colors first, then neighbours."""
+    import numpy as np
+
+    by_color = {}
+    for part in parts:
+        by_color.setdefault(part[2], []).append(part)
+    groups = list(by_color.values())
+    if len(groups) > MAX_MESHES:
+        step = -(-len(parts) // MAX_MESHES)
+        groups = [parts[i:i + step] for i in range(0, len(parts), step)]
+    merged = []
+    for group in groups:
+        tris = np.concatenate([np.asarray(t, dtype=np.float64).reshape(-1, 3, 3) for t, _, _ in group])
+        nrm = None
+        if group[0][1] is not None:
+            nrm = np.concatenate([np.asarray(n, dtype=np.float64).reshape(-1, 3, 3) for _, n, _ in group])
+        merged.append((tris, nrm, group[0][2]))
+    return merged
+
+
+def encode_meshes(meshes, colors=None, normals=False):
+    """
+    Encode trimesh.Trimesh objects (with optional RGBA colors) into one AMCM buffer.
+
+    normals=True stores the meshes' smooth vertex normals; otherwise the viewer
+    computes flat facet normals.
+    """
+    colors = colors or [None] * len(meshes)
+    parts = [(mesh.triangles, mesh.vertex_normals[mesh.faces] if normals else None,
+              tuple(int(c) for c in rgba) if rgba is not None else (255, 255, 255, 255))
+             for mesh, rgba in zip(meshes, colors)]
+    if len(parts) > MAX_MESHES:
+        parts = _merge_parts(parts)
+    chunks = [_HEADER.pack(MAGIC, VERSION, FLAG_NORMALS if normals else 0, len(parts))]
+    chunks += [_encode_one(*part) for part in parts]
+    return b"".join(chunks)
+
+
+def decode(data):
+    """
+    Meshes of an AMCM buffer as dicts {"positions" (V, 3) float32, "normals"
+    (V, 3) float32 or None, "index" (N,) uint32, "rgba"}, like parseAMCM().
+    """
+    import numpy as np
+
+    magic, _version, flags, count = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("not an AMCM buffer")
+    buf = memoryview(data)
+    out, off = [], _HEADER.size
+    for _ in range(count):
+        head = _MESH_HEADER.unpack_from(data, off)
+        nv, ni, nib = head[:3]
+        rgba, lo, span = head[3:7], np.array(head[7:10]), np.array(head[10:13])
+        off += _MESH_HEADER.size
+        q = np.frombuffer(buf[off:off + 6 * nv], dtype="<u2").reshape(-1, 3)
+        positions = (lo + q / 65535.0 * span).astype(np.float32)
+        off += 6 * nv
+        normals = None
+        if flags & FLAG_NORMALS:
+            o = np.frombuffer(buf[off:off + 2 * nv], dtype=np.int8).reshape(-1, 2) / 127.0
+            x, y = o[:, 0], o[:, 1]
+            z = 1.0 - np.abs(x) - np.abs(y)
+            neg = z < 0
+            x, y = (np.where(neg, (1.0 - np.abs(y)) * np.where(x >= 0, 1.0, -1.0), x),
+                    np.where(neg, (1.0 - np.abs(x)) * np.where(y >= 0, 1.0, -1.0), y))
+            n = np.stack([x, y, z], axis=1)
+            normals = (n / np.maximum(np.linalg.norm(n, axis=1, keepdims=True), 1e-12)).astype(np.float32)
+            off += 2 * nv
+        index = np.empty(ni, dtype=np.uint32)
+        p, cur = off, 0
+        for i in range(ni):
+            z = shift = 0
+            while True:
+                b = data[p]
+                p += 1
+                z |= (b & 0x7F) << shift
+                shift += 7
+                if not b & 0x80:
+                    break
+            cur += -((z + 1) >> 1) if z & 1 else z >> 1
+            index[i] = cur
+        off += nib
+        off += -off % 4
+        out.append({"positions": positions, "normals": normals, "index": index, "rgba": rgba})
+    return out
+
+
+def encode_stl(path):
+    """AMCM buffer for one STL file (single mesh, flat normals, color left to the viewer)."""
+    import trimesh
+
+    mesh = trimesh.load(path, force="mesh", process=False)
+    return encode_meshes([mesh])
+
+
+def encode_scene(scene, normals=True):
+    """AMCM buffer for every geometry of a trimesh Scene, node transforms applied."""
+    import trimesh
+
+    meshes, colors = [], []
+    for geom in scene.dump():
+        if not isinstance(geom, trimesh.Trimesh) or not len(geom.faces):
+            continue
+        try:
+            rgba = tuple(int(c) for c in geom.visual.main_color)
+        except Exception:
+            rgba = (200, 200, 200, 255)
+        meshes.append(geom)
+        colors.append(rgba)
+    return encode_meshes(meshes, colors, normals=normals)
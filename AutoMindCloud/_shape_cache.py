@@ -0,0 +1,92 @@
+"""
+Process-wide in-memory cache of parsed CAD files.
+
+Importing a STEP file (CadQuery/OCCT for the orthographic drawings,
+cascadio + trimesh for the 3D viewer) is usually the slowest step of a
+render. Parsed objects are kept here keyed by (kind, absolute path,
+mtime, size), so re-rendering the same part with different options skips
+the parse. Entries are evicted least recently used first once their
+estimated size exceeds max_bytes. Callers must not mutate what they get
+back (copy first).
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+
+class ShapeCache:
+    """Size-bounded LRU of parsed objects, one entry per (kind, file version)."""
+
+    def __init__(self, max_bytes=1 << 30):
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (object, nbytes)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(kind, path):
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        return (kind, path, st.st_mtime_ns, st.st_size)
+
+    def get_or_load(self, kind, path, loader, sizeof=None):
+        """
+        Return the parsed object for `path`, calling loader(path) on a miss.
+
+        sizeof(obj) estimates the memory held by the object; by default the
+        file size is used.
+        """
+        key = self.key_for(kind, path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        obj = loader(path)
+        try:
+            nbytes = int(sizeof(obj)) if sizeof else key[3]
+        except Exception:
+            nbytes = key[3]
+
+        with self._lock:
+            # an older version of the same file can never be hit again
+            for old in [k for k in self._entries if k[:2] == key[:2] and k != key]:
+                del self._entries[old]
+            self._entries[key] = (obj, nbytes)
+            self._evict(keep=key)
+        return obj
+
+    def _evict(self, keep=None):
+        total = sum(n for _, n in self._entries.values())
+        for k in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            if k == keep:
+                continue
+            total -= self._entries.pop(k)[1]
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": sum(n for _, n in self._entries.values()),
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Shared by Step_Render (cascadio scenes) and Step_Orthographic_Render (CadQuery shapes).
+SHAPE_CACHE = ShapeCache()
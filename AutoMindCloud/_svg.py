@@ -0,0 +1,169 @@
+"""
+Single-pass SVG post-processing for the orthographic drawings.
+
+exporters.getSVG output for detailed parts reaches tens of MB. The cleaner
+here drops the XML prolog, every <rect> carrying width/height/fill (the
+exporter's background) and stray </rect> closers in one forward scan: it
+only stops at "<?xml", "<rect" and "</rect", looks at that single tag, and
+copies the text in between through in bulk. Nothing backtracks over the
+document, so the cost is linear in its size. It takes an iterable of text
+chunks and yields cleaned chunks, buffering at most one candidate tag.
+"""
+
+import re
+
+_CANDIDATE_RE = re.compile(r"<(?:\?xml|/?rect)", re.IGNORECASE)
+# attributes that mark a <rect> as background (checked on the tag text only)
+_RECT_ATTR_RE = re.compile(r'\b(?:width|height|fill)\s*=\s*"', re.IGNORECASE)
+_CLOSE_RECT_RE = re.compile(r"</rect\s*>", re.IGNORECASE)
+
+_CARRY = 5  # a chunk may end in the middle of "<rect" / "<?xml"
+
+
+def _drop_tag(tag):
+    if tag[1] == "?":
+        return tag.endswith("?>")
+    if tag[1] == "/":
+        return _CLOSE_RECT_RE.fullmatch(tag) is not None
+    return _RECT_ATTR_RE.search(tag) is not None
+
+
+def iter_clean_svg(chunks):
+    """Yield the cleaned SVG for an iterable of text chunks (linear time, bounded buffer)."""
+    buf = ""
+    for chunk in chunks:
+        buf += chunk
+        pos = 0
+        for m in _CANDIDATE_RE.finditer(buf):
+            if m.start() < pos:
+                continue
+            end = m.end()
+            gt = buf.find(">", end)
+            if gt < 0:
+                break  # the tag ends in the next chunk
+            if m.group().lower() == "<rect":
+                c = buf[end]
+                if c.isalnum() or c in "_-:.":  # <rectangle>, <rect-foo>: not a rect
+                    continue
+            if m.start() > pos:
+                yield buf[pos:m.start()]
+            tag = buf[m.start():gt + 1]
+            if not _drop_tag(tag):
+                yield tag
+            pos = gt + 1
+        else:
+            m = None
+
+        if m is not None:  # stopped at an incomplete candidate: keep it for the next chunk
+            keep = m.start()
+        else:
+            keep = max(pos, len(buf) - _CARRY)
+            lt = buf.rfind("<", keep)
+            keep = lt if lt >= 0 else len(buf)
+        if keep > pos:
+            yield buf[pos:keep]
+        buf = buf[keep:]
+    if buf:
+        yield buf
+
+
+def clean_svg(svg, chunk_size=1 << 20):
+    """Cleaned copy of an SVG string (see iter_clean_svg)."""
+    if not svg:
+        return svg
+    chunks = (svg[i:i + chunk_size] for i in range(0, len(svg), chunk_size))
+    return "".join(iter_clean_svg(chunks)).strip()
+
+
+# --- Path optimizer -------------------------------------------------------
+
+_PATH_TAG_RE = re.compile(r"<path\b[^>]*>", re.IGNORECASE)
+_D_ATTR_RE = re.compile(r'(\sd\s*=\s*")([^"]*)(")')
+_POINT_RE = re.compile(r"^([ML])([^,\s]+),([^,\s]+)$")
+_NUM_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+def _fmt(v, precision):
+    s = "%.*f" % (precision, v)
+    if "." in s:
+        s = s.rstrip("0").rstrip(".")
+    return "0" if s in ("-0", "") else s
+
+
+def _merge_collinear(points, tol):
+    """Drop repeated points and interior points lying within `tol` of a straight run."""
+    out = [points[0]]
+    run = []  # points merged into the current segment out[-2] -> out[-1]
+    for p in points[1:]:
+        if p == out[-1]:
+            continue
+        if len(out) >= 2:
+            ax, ay = out[-2]
+            dx, dy = p[0] - ax, p[1] - ay
+            length2 = dx * dx + dy * dy
+            ok = length2 > 0
+            for qx, qy in (run + [out[-1]]) if ok else ():
+                ux, uy = qx - ax, qy - ay
+                dot = ux * dx + uy * dy
+                if abs(ux * dy - uy * dx) > tol * length2 ** 0.5 or dot < 0 or dot > length2:
+                    ok = False
+                    break
+            if ok:
+                run.append(out[-1])
+                out[-1] = p
+                continue
+        run = []
+        out.append(p)
+    return out
+
+
+def _optimize_d(d, precision, tol):
+    """Rounded, simplified path data, "" for a zero-length path, or None to keep `d`."""
+    subpaths = []
+    for token in d.split():
+        m = _POINT_RE.match(token)
+        if not m:
+            return None
+        try:
+            pt = (round(float(m.group(2)), precision), round(float(m.group(3)), precision))
+        except ValueError:
+            return None
+        if m.group(1) == "M" or not subpaths:
+            subpaths.append([pt])
+        else:
+            subpaths[-1].append(pt)
+
+    parts = []
+    for pts in subpaths:
+        pts = _merge_collinear(pts, tol)
+        if len(pts) < 2:
+            continue  # zero-length subpath
+        parts.append(" ".join("%s%s,%s" % ("L" if i else "M", _fmt(x, precision), _fmt(y, precision))
+                              for i, (x, y) in enumerate(pts)))
+    return " ".join(parts)
+
+
+def optimize_svg(svg, precision=3):
+    """
+    Shrink the polyline paths written by exporters.getSVG: coordinates are
+    rounded to `precision` decimals (drawing units), repeated points and
+    collinear interior points are dropped, and zero-length paths are removed.
+    Paths using other commands only get their numbers rounded.
+    """
+    if not svg:
+        return svg
+    tol = 10.0 ** -precision
+
+    def fix_tag(m):
+        tag = m.group()
+        a = _D_ATTR_RE.search(tag)
+        if a is None:
+            return tag
+        d = _optimize_d(a.group(2), precision, tol)
+        if d is None:
+            d = _NUM_RE.sub(lambda n: _fmt(float(n.group()), precision), a.group(2))
+        elif not d:
+            return ""
+        return tag[:a.start(2)] + d + tag[a.end(2):]
+
+    return _PATH_TAG_RE.sub(fix_tag, svg)
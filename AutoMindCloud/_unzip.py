@@ -0,0 +1,147 @@
+"""
+Selective, parallel ZIP extraction for Download_URDF.
+
+extract() writes the chosen members of an archive into `dest`:
+
+- members are filtered (robot_member keeps urdf/ and meshes/ trees plus
+  package.xml) and a single top-level folder in the archive is stripped;
+- members are decompressed by a thread pool, each thread reading through
+  its own ZipFile handle;
+- a state file in `dest` (STATE_NAME) records each member's CRC-32 and the
+  size/mtime it was written with. A file whose CRC is unchanged and that
+  was not touched since is hard-linked into the new tree instead of being
+  extracted again;
+- the new tree is built next to `dest` and swapped in at the end, so an
+  interrupted run never leaves a half-extracted package.
+"""
+
+import os
+import json
+import shutil
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+STATE_NAME = ".automindcloud_extract.json"
+ROBOT_DIRS = ("urdf", "meshes")
+# Files of ours inside `dest` that survive a re-extraction (stat-validated indexes)
+KEEP_NAMES = (".automindcloud_index.json",)
+
+
+def _junk(name):
+    return any(p.startswith(".") or p == "__MACOSX" for p in name.split("/") if p)
+
+
+def robot_member(rel):
+    """True for files under a urdf/ or meshes/ folder, and package.xml files."""
+    parts = rel.split("/")
+    return parts[-1] == "package.xml" or any(p.lower() in ROBOT_DIRS for p in parts[:-1])
+
+
+def _common_root(names):
+    """'top/' when every name lives under one top-level folder, else ''."""
+    tops = {n.split("/", 1)[0] for n in names}
+    if len(tops) == 1 and all("/" in n for n in names):
+        return tops.pop() + "/"
+    return ""
+
+
+def _load_state(dest):
+    try:
+        with open(os.path.join(dest, STATE_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _reusable(path, crc, old):
+    if not old or old.get("crc") != crc:
+        return False
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return old.get("size") == st.st_size and old.get("mtime") == st.st_mtime_ns
+
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def extract(zip_path, dest, select=robot_member, workers=None):
+    """
+    Extract the members of `zip_path` accepted by select(rel_path) into dest.
+    select=None extracts everything. Returns {"extracted", "reused",
+    "skipped", "bytes"} (bytes written by extraction).
+    """
+    with zipfile.ZipFile(zip_path) as zf:
+        infos = [i for i in zf.infolist() if not i.is_dir() and not _junk(i.filename)]
+    root = _common_root([i.filename for i in infos])
+
+    members = []
+    for info in infos:
+        rel = info.filename[len(root):]
+        if os.path.isabs(rel) or ".." in rel.split("/"):
+            raise ValueError(f"Unsafe path in archive: {info.filename}")
+        if select is None or select(rel):
+            members.append((info, rel))
+    stats = {"extracted": 0, "reused": 0, "skipped": len(infos) - len(members), "bytes": 0}
+
+    old = _load_state(dest)
+    reuse = {rel for info, rel in members if _reusable(os.path.join(dest, rel), info.CRC, old.get(rel))}
+    if len(reuse) == len(members) and set(old) == reuse:
+        stats["reused"] = len(reuse)  # nothing changed: leave dest alone
+        return stats
+
+    tmp = dest.rstrip("/\\") + ".extracting"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for d in {os.path.dirname(rel) for _, rel in members}:
+        os.makedirs(os.path.join(tmp, d), exist_ok=True)
+
+    local = threading.local()
+
+    def work(item):
+        info, rel = item
+        target = os.path.join(tmp, rel)
+        if rel in reuse:
+            _link_or_copy(os.path.join(dest, rel), target)
+            return 0
+        if not hasattr(local, "zf"):
+            local.zf = zipfile.ZipFile(zip_path)
+        with local.zf.open(info) as src, open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        return info.file_size
+
+    try:
+        # large members first so the pool stays busy until the end
+        order = sorted(members, key=lambda m: m[0].file_size, reverse=True)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            stats["bytes"] = sum(pool.map(work, order))
+        for name in KEEP_NAMES:
+            if os.path.isfile(os.path.join(dest, name)):
+                _link_or_copy(os.path.join(dest, name), os.path.join(tmp, name))
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    state = {}
+    for info, rel in members:
+        st = os.stat(os.path.join(tmp, rel))
+        state[rel] = {"crc": info.CRC, "size": st.st_size, "mtime": st.st_mtime_ns}
+    with open(os.path.join(tmp, STATE_NAME), "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+    backup = dest.rstrip("/\\") + ".previous"
+    shutil.rmtree(backup, ignore_errors=True)
+    if os.path.exists(dest):
+        os.replace(dest, backup)
+    os.replace(tmp, dest)
+    shutil.rmtree(backup, ignore_errors=True)
+
+    stats["reused"] = len(reuse)
+    stats["extracted"] = len(members) - len(reuse)
+    return stats
@@ -0,0 +1,271 @@
+"""
+Persistent index of a URDF package (urdf/ + meshes/) for URDF_Render.
+
+Scanning a package means finding the urdf/ and meshes/ folders, parsing
+every URDF/xacro (see _urdf_model) to pick the one with visual meshes,
+and walking meshes/.
+On network drives that dominates render time, so the result is kept in
+an index file (INDEX_NAME in the package folder, or under the cache root
+when the folder is read-only). Later scans only stat:
+
+- urdf/ is listed (it is small) and a URDF is re-parsed only when its
+  size or mtime (or that of a file it includes) changed;
+- each folder under meshes/ is re-listed only when its own mtime changed
+  (adding, removing or renaming entries updates it);
+- mesh files are stat'ed, and their SHA-256 (used by the LOD/AMCM caches)
+  is recomputed only when size or mtime changed.
+"""
+
+import os
+import re
+import json
+import hashlib
+import threading
+
+from AutoMindCloud import _urdf_model
+from AutoMindCloud._cache import cache_root, file_digest
+
+INDEX_NAME = ".automindcloud_index.json"
+INDEX_VERSION = 2
+
+MESH_EXTS = _urdf_model.MESH_EXTS + (".png", ".jpg", ".jpeg")
+# Fallback for URDFs that are not well-formed XML
+_REF_RE = re.compile(r'filename="([^"]+\.(?:stl|dae|obj|glb))"', re.I)
+
+
+def find_dirs(root):
+    """(urdf_dir, meshes_dir) in `root` or one of its direct subfolders, else (None, None)."""
+    u, m = os.path.join(root, "urdf"), os.path.join(root, "meshes")
+    if os.path.isdir(u) and os.path.isdir(m):
+        return u, m
+    if os.path.isdir(root):
+        for name in os.listdir(root):
+            cand = os.path.join(root, name)
+            uu, mm = os.path.join(cand, "urdf"), os.path.join(cand, "meshes")
+            if os.path.isdir(uu) and os.path.isdir(mm):
+                return uu, mm
+    return None, None
+
+
+def _read_urdf(path):
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read().lstrip('\ufeff')
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _index_paths(folder):
+    local = os.path.join(folder, INDEX_NAME)
+    key = hashlib.sha256(os.path.abspath(folder).encode("utf-8")).hexdigest()[:32]
+    return local, os.path.join(cache_root(), "urdf_index", key + ".json")
+
+
+class PackageIndex:
+    """
+    Result of scan(): the chosen URDF text and model, its mesh references
+    with the files they resolve to (`resolved`, None when missing), the
+    files under meshes/ and a digest(path) lookup backed by the index.
+    """
+
+    def __init__(self, folder, urdf_dir, meshes_dir, data):
+        self.folder = folder
+        self.urdf_dir = urdf_dir
+        self.meshes_dir = meshes_dir
+        self._data = data
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.urdf_text = ""
+        self.model = None
+        self.mesh_refs = []
+        self.resolved = {}
+        self.disk_files = []
+
+    def digest(self, path):
+        """SHA-256 of a file under meshes/, reused from the index while size/mtime match."""
+        rel = os.path.relpath(path, self.meshes_dir).replace("\\", "/")
+        entry = self._data["files"].get(rel)
+        if entry is None:
+            return file_digest(path)
+        if not entry.get("sha256"):
+            sha = file_digest(path)
+            with self._lock:
+                entry["sha256"] = sha
+                self._dirty = True
+        return entry["sha256"]
+
+    def save(self, force=False):
+        """Write the index (package folder first, cache root if that fails)."""
+        if not (force or self._dirty):
+            return None
+        blob = json.dumps(self._data, separators=(",", ":"))
+        for path in _index_paths(self.folder):
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = path + ".tmp%d" % os.getpid()
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(blob)
+                os.replace(tmp, path)
+                self._dirty = False
+                return path
+            except OSError:
+                continue
+        return None
+
+
+def _load(folder):
+    for path in _index_paths(folder):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if data.get("version") == INDEX_VERSION:
+            return data
+    return None
+
+
+def _is_current(entry):
+    for path, key in entry["deps"].items():
+        try:
+            if _stat_key(path) != key:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def _scan_urdfs(urdf_dir, old, roots, loaded):
+    """
+    {name: {size, visual, collision, deps}} for urdf/*.urdf and *.xacro,
+    re-parsing only files whose own or included files' size/mtime changed.
+    Files parsed here are left in `loaded` as name -> (text, model).
+    """
+    out = {}
+    for name in os.listdir(urdf_dir):
+        if not name.lower().endswith(_urdf_model.URDF_EXTS):
+            continue
+        path = os.path.join(urdf_dir, name)
+        prev = old.get(name)
+        if prev and _is_current(prev):
+            out[name] = prev
+            continue
+        try:
+            text, model, deps = _urdf_model.load(path, roots)
+            loaded[name] = (text, model)
+            visual, collision = model.mesh_refs(), model.mesh_refs(visuals=False, collisions=True)
+        except OSError:
+            continue
+        except Exception:  # not well-formed XML: plain filename="..." scan
+            deps = [os.path.abspath(path)]
+            try:
+                visual, collision = list(dict.fromkeys(_REF_RE.findall(_read_urdf(path)))), []
+            except OSError:
+                continue
+        try:
+            deps = {d: _stat_key(d) for d in deps}
+        except OSError:
+            continue
+        out[name] = {"size": os.path.getsize(path), "visual": visual, "collision": collision, "deps": deps}
+    return out
+
+
+def _scan_meshes(meshes_dir, old_dirs, old_files):
+    """Walk meshes/, re-listing only folders whose mtime changed; re-stat every file."""
+    dirs, files = {}, {}
+    stack = [""]
+    while stack:
+        rel = stack.pop()
+        path = os.path.join(meshes_dir, rel) if rel else meshes_dir
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        prev = old_dirs.get(rel)
+        if prev and prev["mtime"] == mtime:
+            names, subdirs = prev["files"], prev["dirs"]
+        else:
+            names, subdirs = [], []
+            with os.scandir(path) as it:
+                for e in it:
+                    if e.is_dir():
+                        subdirs.append(e.name)
+                    elif e.name.lower().endswith(MESH_EXTS):
+                        names.append(e.name)
+            names.sort()
+            subdirs.sort()
+        dirs[rel] = {"mtime": mtime, "files": names, "dirs": subdirs}
+        stack += [(rel + "/" + d) if rel else d for d in reversed(subdirs)]
+
+        for name in names:
+            frel = (rel + "/" + name) if rel else name
+            try:
+                st = os.stat(os.path.join(meshes_dir, frel))
+            except OSError:
+                continue
+            prev_f = old_files.get(frel)
+            same = prev_f and prev_f["size"] == st.st_size and prev_f["mtime"] == st.st_mtime_ns
+            files[frel] = {"size": st.st_size, "mtime": st.st_mtime_ns,
+                           "sha256": prev_f.get("sha256") if same else None}
+    return dirs, files
+
+
+def scan(folder, use_index=True, collisions=False):
+    """
+    Scan a URDF package folder; returns a PackageIndex, or None when no
+    urdf/ + meshes/ pair is found. The file picked is the largest .urdf with
+    visual meshes, else the largest such .xacro, else the largest file.
+    mesh_refs lists the visual meshes, plus collision meshes if `collisions`.
+    """
+    old = (_load(folder) if use_index else None) or {}
+    urdf_dir = meshes_dir = None
+    if old.get("urdf_dir") is not None:
+        u = os.path.join(folder, old["urdf_dir"])
+        m = os.path.join(folder, old["meshes_dir"])
+        if os.path.isdir(u) and os.path.isdir(m):
+            urdf_dir, meshes_dir = u, m
+    if urdf_dir is None:
+        urdf_dir, meshes_dir = find_dirs(folder)
+        if not urdf_dir or not meshes_dir:
+            return None
+        old = {}
+
+    roots = _urdf_model.package_roots(os.path.dirname(urdf_dir), folder)
+    loaded = {}
+    urdfs = _scan_urdfs(urdf_dir, old.get("urdfs", {}), roots, loaded)
+    dirs, files = _scan_meshes(meshes_dir, old.get("dirs", {}), old.get("files", {}))
+    data = {
+        "version": INDEX_VERSION,
+        "urdf_dir": os.path.relpath(urdf_dir, folder),
+        "meshes_dir": os.path.relpath(meshes_dir, folder),
+        "urdfs": urdfs,
+        "dirs": dirs,
+        "files": files,
+    }
+
+    pkg = PackageIndex(folder, urdf_dir, meshes_dir, data)
+    # files included by another one (xacro fragments) are not candidates themselves
+    included = {d for n in urdfs for d in urdfs[n]["deps"] if d != os.path.abspath(os.path.join(urdf_dir, n))}
+    order = [n for n in urdfs if os.path.abspath(os.path.join(urdf_dir, n)) not in included] or list(urdfs)
+    order.sort(key=lambda n: (not n.lower().endswith(".xacro"), urdfs[n]["size"]), reverse=True)
+    chosen = next((n for n in order if urdfs[n]["visual"]), order[0] if order else None)
+    if chosen is not None:
+        path = os.path.join(urdf_dir, chosen)
+        if chosen in loaded:
+            pkg.urdf_text, pkg.model = loaded[chosen]
+        else:
+            try:
+                pkg.urdf_text, pkg.model, _ = _urdf_model.load(path, roots)
+            except Exception:
+                pkg.urdf_text = _read_urdf(path)
+        entry = urdfs[chosen]
+        pkg.mesh_refs = list(dict.fromkeys(entry["visual"] + (entry["collision"] if collisions else [])))
+        pkg.resolved = {r: _urdf_model.resolve(r, urdf_dir, roots) for r in pkg.mesh_refs}
+    pkg.disk_files = [os.path.join(meshes_dir, rel) for rel in files]
+
+    if use_index and data != old:
+        pkg._dirty = True
+        pkg.save()
+    return pkg
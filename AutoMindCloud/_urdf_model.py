@@ -0,0 +1,215 @@
+"""
+URDF model for URDF_Render: links, joints and the meshes their visuals and
+collisions reference.
+
+The URDF is read with ElementTree.iterparse in a single streaming pass;
+each <link>/<joint> element is dropped once recorded. .xacro files are
+expanded first: with the `xacro` package when it is installed, otherwise
+with a small built-in pass that inlines <xacro:include> files and
+substitutes ${property} and $(find pkg) (macros are left unexpanded).
+
+Mesh filenames are resolved to files deterministically: package://<pkg>/
+against the package folders found in the workspace (package.xml <name>,
+else the folder name), relative paths against the URDF's folder.
+"""
+
+import io
+import os
+import re
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+
+XACRO_NS = "http://www.ros.org/wiki/xacro"
+URDF_EXTS = (".urdf", ".xacro")
+MESH_EXTS = (".stl", ".dae", ".obj", ".glb")
+
+Mesh = namedtuple("Mesh", "filename scale")
+Joint = namedtuple("Joint", "name type parent child")
+
+
+class Link:
+    __slots__ = ("name", "visuals", "collisions")
+
+    def __init__(self, name):
+        self.name = name
+        self.visuals = []
+        self.collisions = []
+
+
+class UrdfModel:
+    """Links (with visual/collision meshes) and joints of a robot description."""
+
+    def __init__(self):
+        self.name = None
+        self.links = {}
+        self.joints = []
+
+    def mesh_refs(self, visuals=True, collisions=False):
+        """Mesh filenames in document order, without duplicates."""
+        refs = []
+        for link in self.links.values():
+            if visuals:
+                refs += [m.filename for m in link.visuals]
+            if collisions:
+                refs += [m.filename for m in link.collisions]
+        return list(dict.fromkeys(r for r in refs if r))
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def parse(source):
+    """UrdfModel from a path or file object, in one iterparse pass."""
+    model = UrdfModel()
+    link = section = None
+    for event, el in ET.iterparse(source, events=("start", "end")):
+        tag = _local(el.tag)
+        if event == "start":
+            if tag == "robot" and model.name is None:
+                model.name = el.get("name")
+            elif tag == "link":
+                link = Link(el.get("name"))
+            elif tag in ("visual", "collision") and link is not None:
+                section = tag
+            continue
+        if tag == "mesh" and link is not None and section:
+            mesh = Mesh(el.get("filename", ""), el.get("scale"))
+            (link.visuals if section == "visual" else link.collisions).append(mesh)
+        elif tag in ("visual", "collision"):
+            section = None
+        elif tag == "link" and link is not None:
+            model.links[link.name] = link
+            link = None
+            el.clear()
+        elif tag == "joint":
+            parent, child = el.find("parent"), el.find("child")
+            model.joints.append(Joint(el.get("name"), el.get("type"),
+                                      parent.get("link") if parent is not None else None,
+                                      child.get("link") if child is not None else None))
+            el.clear()
+    return model
+
+
+# --- package:// resolution ---------------------------------------------------
+
+_PKG_NAME_RE = re.compile(r"<name>\s*([^<\s]+)\s*</name>")
+
+
+def package_roots(*folders):
+    """
+    {package name: folder} for the given folders and their direct subfolders
+    that look like ROS packages (package.xml, or urdf/ or meshes/ inside).
+    The first folder found for a name wins; subfolders are visited sorted.
+    """
+    roots = {}
+    for top in folders:
+        if not top or not os.path.isdir(top):
+            continue
+        cands = [top] + [os.path.join(top, n) for n in sorted(os.listdir(top))]
+        for d in cands:
+            if not os.path.isdir(d):
+                continue
+            name = None
+            manifest = os.path.join(d, "package.xml")
+            if os.path.isfile(manifest):
+                try:
+                    with open(manifest, "r", encoding="utf-8", errors="ignore") as f:
+                        m = _PKG_NAME_RE.search(f.read())
+                    name = m.group(1) if m else None
+                except OSError:
+                    pass
+            elif not (os.path.isdir(os.path.join(d, "urdf")) or os.path.isdir(os.path.join(d, "meshes"))):
+                continue
+            roots.setdefault(name or os.path.basename(os.path.abspath(d)), os.path.abspath(d))
+    return roots
+
+
+def resolve(ref, base_dir, roots):
+    """Absolute path of an existing file for a URDF filename, or None."""
+    r = ref.strip().replace("\\", "/")
+    if r.startswith("file://"):
+        r = r[len("file://"):]
+    if r.startswith("package://"):
+        pkg, _, rel = r[len("package://"):].partition("/")
+        cands = [os.path.join(roots[pkg], rel)] if pkg in roots else []
+        # unknown package name: the same relative path inside each known package
+        cands += [os.path.join(roots[k], rel) for k in sorted(roots) if k != pkg]
+    elif os.path.isabs(r):
+        cands = [r]
+    else:
+        cands = [os.path.join(base_dir, r)]
+    for c in cands:
+        if os.path.isfile(c):
+            return os.path.abspath(c)
+    return None
+
+
+# --- xacro ---------------------------------------------------------------------
+
+_PROP_RE = re.compile(r"\$\{([A-Za-z_][\w]*)\}")
+_FIND_RE = re.compile(r"\$\(find\s+([^)\s]+)\)")
+
+
+def _expand_builtin(path, roots, props, deps, depth=0):
+    """Element tree of `path` with includes inlined and simple substitutions applied."""
+    if depth > 20:
+        raise ValueError("xacro include depth exceeded at " + path)
+    deps.append(os.path.abspath(path))
+    root = ET.parse(path).getroot()
+    base_dir = os.path.dirname(path)
+
+    def subst(text):
+        text = _FIND_RE.sub(lambda m: roots.get(m.group(1), m.group(0)), text)
+        return _PROP_RE.sub(lambda m: props.get(m.group(1), m.group(0)), text)
+
+    def walk(parent):
+        out = []
+        for child in list(parent):
+            tag = _local(child.tag)
+            xacro = isinstance(child.tag, str) and child.tag.startswith("{%s}" % XACRO_NS)
+            if xacro and tag == "property":
+                if child.get("name") is not None and child.get("value") is not None:
+                    props[child.get("name")] = subst(child.get("value"))
+                continue
+            if xacro and tag == "include":
+                fn = subst(child.get("filename", ""))
+                target = resolve(fn, base_dir, roots) if fn else None
+                if target:
+                    inc = _expand_builtin(target, roots, props, deps, depth + 1)
+                    out += list(inc)
+                continue
+            if xacro and tag in ("arg", "macro"):
+                continue
+            for k, v in child.attrib.items():
+                if "$" in v:
+                    child.set(k, subst(v))
+            child[:] = walk(child)
+            out.append(child)
+        return out
+
+    root[:] = walk(root)
+    return root
+
+
+def load(path, roots=None):
+    """
+    (urdf_text, model, deps) for a .urdf or .xacro file. urdf_text is what
+    the viewer gets (expanded for xacro); deps lists every file read.
+    """
+    roots = roots or {}
+    if not path.lower().endswith(".xacro"):
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            text = f.read().lstrip("\ufeff")
+        return text, parse(io.StringIO(text)), [os.path.abspath(path)]
+
+    deps = []
+    try:
+        import xacro  # optional: full macro/conditional support
+
+        text = xacro.process_file(path).toxml()
+        deps.append(os.path.abspath(path))
+    except ImportError:
+        ET.register_namespace("xacro", XACRO_NS)
+        text = ET.tostring(_expand_builtin(path, roots, {}, deps), encoding="unicode")
+    return text, parse(io.StringIO(text)), deps
@@ -0,0 +1,460 @@
+"""
+Loading the URDF viewer's JS modules (AutoMindCloud/viewer) in a notebook.
+
+URDF_Render used to ask the GitHub API for the latest commit from the
+browser and import the entry module from jsDelivr with a cache-busting
+query, which costs two round-trips per render and never hits the cache.
+Instead the viewer is loaded from one of:
+
+- bundled: the copy installed with the package, joined into a single ES
+  module by bundle(). It is inlined in the page, or published on the asset
+  server under its content hash when that server is in use;
+- github: the repository at a commit resolved once per session on the
+  Python side (github_commit), imported from a pinned jsDelivr URL that
+  the browser can cache for good.
+
+bundle() is a minimal joiner for this viewer's own modules: relative
+`import {..} from './x.js'` statements and `export function/const/let/
+class`, `export default` and `export {..}` forms. Each module runs in its
+own function scope, so top-level names may repeat across files.
+
+The third-party UMD scripts (three.js r132, its loaders, urdf-loader) come
+from jsDelivr by default. script_tags(offline=True) takes them from a
+vendor folder instead (viewer/vendor, or $AUTOMINDCLOUD_VIEWER_VENDOR),
+joined and minified into one script. For an air-gapped machine, fill that
+folder once on a connected one:
+
+    python -m AutoMindCloud._viewer fetch [--dest DIR]
+"""
+
+import os
+import re
+import json
+import hashlib
+import argparse
+import threading
+import urllib.request
+
+VIEWER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "viewer")
+DEFAULT_ENTRY = "urdf_viewer_main.js"
+
+_IMPORT_RE = re.compile(
+    r"^[ \t]*import\s+(?:(\w+)\s*,?\s*)?(?:\{([^}]*)\})?\s*from\s*['\"]([^'\"]+)['\"]\s*;?[ \t]*$", re.M)
+_ANY_IMPORT_RE = re.compile(r"^[ \t]*import[\s{'\"*]", re.M)
+_EXPORT_DECL_RE = re.compile(r"^export\s+((?:async\s+)?function\*?|const|let|var|class)\s+([A-Za-z_$][\w$]*)", re.M)
+_EXPORT_DEFAULT_RE = re.compile(r"^export\s+default\s+", re.M)
+_EXPORT_LIST_RE = re.compile(r"^export\s*\{([^}]*)\}\s*;?[ \t]*$", re.M)
+
+# Pinned UMD scripts: name -> (npm package@version, path inside the package)
+VENDOR_SCRIPTS = {
+    "three": ("three@0.132.2", "build/three.min.js"),
+    "OrbitControls": ("three@0.132.2", "examples/js/controls/OrbitControls.js"),
+    "STLLoader": ("three@0.132.2", "examples/js/loaders/STLLoader.js"),
+    "ColladaLoader": ("three@0.132.2", "examples/js/loaders/ColladaLoader.js"),
+    "OBJLoader": ("three@0.132.2", "examples/js/loaders/OBJLoader.js"),
+    "GLTFLoader": ("three@0.132.2", "examples/js/loaders/GLTFLoader.js"),
+    "URDFLoader": ("urdf-loader@0.12.6", "umd/URDFLoader.js"),
+}
+URDF_SCRIPTS = ("three", "OrbitControls", "STLLoader", "ColladaLoader", "OBJLoader", "GLTFLoader", "URDFLoader")
+STEP_SCRIPTS = ("three", "OrbitControls", "GLTFLoader")
+VENDOR_ENV = "AUTOMINDCLOUD_VIEWER_VENDOR"
+
+_BUNDLES = {}  # (entry, file stats) -> (source, sha256)
+_COMMITS = {}  # (repo, branch) -> short sha, or None when the lookup failed
+_LOCK = threading.Lock()
+
+
+def _var(rel):
+    return "__amc_" + re.sub(r"\W", "_", rel[:-3] if rel.endswith(".js") else rel)
+
+
+def _names(spec):
+    """[(imported, local)] from 'a, b as c'."""
+    out = []
+    for part in spec.split(","):
+        part = part.strip()
+        if part:
+            name, _, alias = part.partition(" as ")
+            out.append((name.strip(), (alias or name).strip()))
+    return out
+
+
+def _module_graph(entry):
+    """Viewer modules reachable from `entry`, dependencies first."""
+    order, seen = [], set()
+
+    def visit(rel, stack):
+        if rel in seen:
+            return
+        if rel in stack:
+            raise ValueError("circular import through " + rel)
+        with open(os.path.join(VIEWER_DIR, rel), "r", encoding="utf-8") as f:
+            text = f.read()
+        for m in _IMPORT_RE.finditer(text):
+            dep = os.path.normpath(os.path.join(os.path.dirname(rel), m.group(3))).replace("\\", "/")
+            if not m.group(3).startswith("."):
+                raise ValueError(f"{rel}: only relative imports can be bundled ({m.group(3)})")
+            visit(dep, stack | {rel})
+        seen.add(rel)
+        order.append((rel, text))
+
+    visit(entry, frozenset())
+    return order
+
+
+def _wrap(rel, text):
+    """Module text as `const __amc_x = (() => {...; return {exports}; })();`."""
+    def import_line(m):
+        src = os.path.normpath(os.path.join(os.path.dirname(rel), m.group(3))).replace("\\", "/")
+        parts = []
+        if m.group(1):
+            parts.append(f"const {m.group(1)} = {_var(src)}.default;")
+        if m.group(2) is not None:
+            binds = ", ".join(a if a == b else f"{a}: {b}" for a, b in _names(m.group(2)))
+            parts.append(f"const {{ {binds} }} = {_var(src)};")
+        return " ".join(parts)
+
+    body = _IMPORT_RE.sub(import_line, text)
+    if _ANY_IMPORT_RE.search(body):
+        raise ValueError(rel + ": unsupported import statement")
+
+    exports = []
+    body = _EXPORT_DECL_RE.sub(lambda m: (exports.append((m.group(2), m.group(2))), f"{m.group(1)} {m.group(2)}")[1], body)
+
+    def export_list(m):
+        exports.extend((local, name) for local, name in _names(m.group(1)))
+        return ""
+
+    body = _EXPORT_LIST_RE.sub(export_list, body)
+    if _EXPORT_DEFAULT_RE.search(body):
+        body = _EXPORT_DEFAULT_RE.sub("const __default = ", body, count=1)
+        exports.append(("__default", "default"))
+    if re.search(r"^export\b", body, re.M):
+        raise ValueError(rel + ": unsupported export statement")
+
+    ret = ", ".join(local if local == name else f"{name}: {local}" for local, name in exports)
+    return f"// ---- {rel}\nconst {_var(rel)} = (() => {{\n{body}\nreturn {{ {ret} }};\n}})();\n", exports
+
+
+def bundle(entry=DEFAULT_ENTRY, script=False):
+    """
+    (source, sha256) of the packaged viewer joined into one minified ES
+    module that exports what `entry` exports. Rebuilt only when a viewer
+    file changes. script=True gives a classic script instead, declaring
+    entry's named exports as consts (Step_Render inlines core/AMCM.js so).
+    """
+    stats = []
+    for root, dirs, names in os.walk(VIEWER_DIR):
+        dirs[:] = [d for d in dirs if d != "vendor"]
+        for n in sorted(names):
+            if n.endswith(".js"):
+                st = os.stat(os.path.join(root, n))
+                stats.append((os.path.join(root, n), st.st_mtime_ns, st.st_size))
+    key = (entry, script, tuple(sorted(stats)))
+    with _LOCK:
+        if key in _BUNDLES:
+            return _BUNDLES[key]
+
+    parts, entry_exports = ["/* AutoMindCloud viewer bundle */\n"], []
+    for rel, text in _module_graph(entry):
+        code, exports = _wrap(rel, text)
+        parts.append(code)
+        if rel == entry:
+            entry_exports = exports
+    main = _var(entry)
+    named = [name for _, name in entry_exports if name != "default"]
+    if named:
+        parts.append(f"{'' if script else 'export '}const {{ {', '.join(named)} }} = {main};\n")
+    if any(name == "default" for _, name in entry_exports) and not script:
+        parts.append(f"export default {main}.default;\n")
+    source = minify_js("".join(parts))
+    result = (source, hashlib.sha256(source.encode("utf-8")).hexdigest())
+    with _LOCK:
+        _BUNDLES[key] = result
+    return result
+
+
+def github_commit(repo, branch, timeout=3.0):
+    """Short SHA of `branch` in `repo`, looked up once per session; None when offline."""
+    k = (repo, branch)
+    with _LOCK:
+        if k in _COMMITS:
+            return _COMMITS[k]
+    sha = None
+    try:
+        req = urllib.request.Request(f"https://api.github.com/repos/{repo}/commits/{branch}",
+                                     headers={"Accept": "application/vnd.github+json"})
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            sha = (json.load(r).get("sha") or "")[:7] or None
+    except Exception:
+        sha = None
+    with _LOCK:
+        _COMMITS[k] = sha
+    return sha
+
+
+def module_source(source="auto", repo="ArtemioA/AutoMindCloud", branch="main",
+                  comp_file="AutoMindCloud/viewer/" + DEFAULT_ENTRY, server=None):
+    """
+    How the page gets the viewer entry module: ("url", url) or ("inline", js).
+
+    source: "bundled" (packaged copy), "github" (commit pinned once per
+    session), or "auto": bundled unless another repo/branch/entry file was
+    asked for. With an asset `server` the bundle is served by content hash
+    instead of inlined. If GitHub can't be reached, the packaged copy is
+    used when it matches the requested entry, else the branch URL.
+    """
+    prefix = "AutoMindCloud/viewer/"
+    entry = comp_file[len(prefix):] if comp_file.startswith(prefix) else None
+    packaged = entry is not None and os.path.isfile(os.path.join(VIEWER_DIR, entry))
+    if source == "auto":
+        default = (repo, branch, comp_file) == ("ArtemioA/AutoMindCloud", "main", prefix + DEFAULT_ENTRY)
+        source = "bundled" if packaged and default else "github"
+
+    if source == "github":
+        sha = github_commit(repo, branch)
+        if sha or not packaged:
+            return "url", f"https://cdn.jsdelivr.net/gh/{repo}@{sha or branch}/{comp_file}"
+    elif source != "bundled":
+        raise ValueError("viewer source must be 'auto', 'bundled' or 'github'")
+    if not packaged:
+        raise FileNotFoundError("viewer module not found in the package: " + comp_file)
+
+    js, sha = bundle(entry)
+    if server is not None:
+        return "url", server.publish_bytes(js.encode("utf-8"), f"viewer.{sha[:12]}.js", mime="text/javascript")
+    return "inline", js
+
+
+# --- minification ---------------------------------------------------------------
+
+_REGEX_AFTER = set("(,=:[!&|?{};+-*%<>~^}")
+_REGEX_KEYWORDS = {"return", "typeof", "case", "in", "of", "new", "delete", "void", "throw", "else", "do",
+                   "yield", "await"}
+_WORD_RE = re.compile(r"[\w$]+$")
+
+
+def _end_of_string(src, i):
+    q, n = src[i], len(src)
+    i += 1
+    while i < n:
+        c = src[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == q or c == "\n":
+            return i + (c == q)
+        i += 1
+    return n
+
+
+def _end_of_template(src, i):
+    n = len(src)
+    i += 1
+    while i < n:
+        c = src[i]
+        if c == "\\":
+            i += 2
+        elif c == "`":
+            return i + 1
+        elif c == "$" and src.startswith("${", i):
+            depth, i = 1, i + 2
+            while i < n and depth:
+                c = src[i]
+                if c in "'\"":
+                    i = _end_of_string(src, i)
+                    continue
+                if c == "`":
+                    i = _end_of_template(src, i)
+                    continue
+                depth += (c == "{") - (c == "}")
+                i += 1
+        else:
+            i += 1
+    return n
+
+
+def _end_of_regex(src, i):
+    n, in_class = len(src), False
+    i += 1
+    while i < n:
+        c = src[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "\n":
+            return i
+        i += 1
+        if in_class:
+            in_class = c != "]"
+        elif c == "[":
+            in_class = True
+        elif c == "/":
+            break
+    while i < n and (src[i].isalnum() or src[i] in "_$"):
+        i += 1
+    return i
+
+
+def _regex_allowed(out):
+    """Whether a '/' after the text emitted so far starts a regex literal."""
+    tail = "".join(out[-24:]).rstrip()
+    if not tail or tail[-1] in _REGEX_AFTER:
+        return True
+    m = _WORD_RE.search(tail)
+    return bool(m) and m.group(0) in _REGEX_KEYWORDS
+
+
+def minify_js(src):
+    """
+    Drop comments (except /*! ... */), indentation, trailing spaces and
+    blank lines. Line breaks are kept so automatic semicolon insertion
+    still sees the same statements; strings, templates and regex literals
+    are copied untouched.
+    """
+    out, i, n = [], 0, len(src)
+    line_start = True
+    while i < n:
+        c = src[i]
+        if c == "\n" or c == "\r":
+            while out and out[-1] in (" ", "\t"):
+                out.pop()
+            if out and out[-1] != "\n":
+                out.append("\n")
+            line_start = True
+            i += 1
+            continue
+        if c in " \t":
+            if not line_start:
+                out.append(c)
+            i += 1
+            continue
+        line_start = False
+        if c == "/" and src.startswith("//", i):
+            j = src.find("\n", i)
+            i = n if j < 0 else j
+        elif c == "/" and src.startswith("/*", i):
+            j = src.find("*/", i + 2)
+            j = n if j < 0 else j + 2
+            if src.startswith("/*!", i):
+                out.append(src[i:j])
+            elif "\n" in src[i:j]:
+                out.append("\n")
+            i = j
+        elif c in "'\"":
+            j = _end_of_string(src, i)
+            out.append(src[i:j])
+            i = j
+        elif c == "`":
+            j = _end_of_template(src, i)
+            out.append(src[i:j])
+            i = j
+        elif c == "/" and _regex_allowed(out):
+            j = _end_of_regex(src, i)
+            out.append(src[i:j])
+            i = j
+        else:
+            out.append(c)
+            i += 1
+    return "".join(out).strip() + "\n"
+
+
+# --- third-party scripts ------------------------------------------------------
+
+def vendor_dir():
+    return os.environ.get(VENDOR_ENV) or os.path.join(VIEWER_DIR, "vendor")
+
+
+def vendor_path(name, root=None):
+    """Local copy of a VENDOR_SCRIPTS entry (npm layout: <root>/<package@version>/<path>)."""
+    pkg, path = VENDOR_SCRIPTS[name]
+    return os.path.join(root or vendor_dir(), pkg, *path.split("/"))
+
+
+def cdn_url(name):
+    pkg, path = VENDOR_SCRIPTS[name]
+    return f"https://cdn.jsdelivr.net/npm/{pkg}/{path}"
+
+
+def fetch_vendor(dest=None, names=None, timeout=60):
+    """Download the pinned scripts that are missing under `dest` (default vendor_dir())."""
+    fetched = []
+    for name in names or VENDOR_SCRIPTS:
+        path = vendor_path(name, dest)
+        if os.path.isfile(path):
+            continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with urllib.request.urlopen(cdn_url(name), timeout=timeout) as r:
+            data = r.read()
+        tmp = path + ".part"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        fetched.append(path)
+    return fetched
+
+
+def vendor_bundle(names):
+    """
+    (source, sha256) of the local copies of `names`, minified and joined in
+    order into one classic script; None when one of them is missing.
+    """
+    paths = [vendor_path(n) for n in names]
+    try:
+        key = ("vendor", tuple((p, os.stat(p).st_mtime_ns, os.stat(p).st_size) for p in paths))
+    except OSError:
+        return None
+    with _LOCK:
+        if key in _BUNDLES:
+            return _BUNDLES[key]
+    parts = []
+    for p in paths:
+        with open(p, "r", encoding="utf-8") as f:
+            text = f.read()
+        parts.append(text if p.endswith(".min.js") else minify_js(text))
+    source = ";\n".join(parts)
+    result = (source, hashlib.sha256(source.encode("utf-8")).hexdigest())
+    with _LOCK:
+        _BUNDLES[key] = result
+    return result
+
+
+def script_tags(names, offline=False, server=None, defer=False):
+    """
+    HTML <script> tags loading the UMD scripts `names`, in order.
+
+    Default: one tag per script from jsDelivr. offline=True: the vendor
+    copies as one minified script, served by content hash from the asset
+    `server` (the browser keeps it for the session) or inlined.
+    """
+    attr = " defer" if defer else ""
+    if not offline:
+        return "\n".join(f'<script{attr} src="{cdn_url(n)}"></script>' for n in names)
+    found = vendor_bundle(names)
+    if found is None:
+        missing = [n for n in names if not os.path.isfile(vendor_path(n))]
+        raise FileNotFoundError(
+            "offline viewer scripts missing in %s: %s (run `python -m AutoMindCloud._viewer fetch` "
+            "on a connected machine, or set $%s)" % (vendor_dir(), ", ".join(missing), VENDOR_ENV))
+    js, sha = found
+    if server is not None:
+        url = server.publish_bytes(js.encode("utf-8"), f"vendor.{sha[:12]}.js", mime="text/javascript")
+        return f'<script{attr} src="{url}"></script>'
+    return "<script>" + js.replace("</script", "<\\/script") + "</script>"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Offline copies of the viewer's third-party scripts.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    f = sub.add_parser("fetch", help="download the pinned scripts into the vendor folder")
+    f.add_argument("--dest", default=None, help="vendor folder (default: %s)" % vendor_dir())
+    args = ap.parse_args(argv)
+    if args.cmd == "fetch":
+        for path in fetch_vendor(args.dest):
+            print("fetched", path)
+        print("vendor folder:", args.dest or vendor_dir())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
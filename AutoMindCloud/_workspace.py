@@ -0,0 +1,115 @@
+"""
+Where AutoMindCloud reads inputs and writes outputs.
+
+- workspace_root(): folder for downloads (Download_Step / Download_URDF)
+  and board snapshots. Set_Workspace(path) for the session, else
+  $AUTOMINDCLOUD_WORKSPACE, else /content when it exists (Colab), else the
+  current directory. Absolute names bypass it entirely.
+- find_input(): inputs are used where they are, never copied: a path as
+  given, else relative to the current directory, else to the workspace.
+- scratch_dir() / scratch_file(): intermediate files (e.g. cascadio's GLB)
+  live in one private temp folder ($AUTOMINDCLOUD_SCRATCH, else the
+  system temp dir), removed file by file and as a whole at exit.
+- map_file(): read-only mmap of a file, so hashing and base64-encoding
+  large meshes don't copy them into Python memory first.
+"""
+
+import os
+import mmap
+import atexit
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+
+WORKSPACE_ENV = "AUTOMINDCLOUD_WORKSPACE"
+SCRATCH_ENV = "AUTOMINDCLOUD_SCRATCH"
+COLAB_ROOT = "/content"
+
+_workspace = None
+_scratch = None
+_lock = threading.Lock()
+
+
+def set_workspace(path=None):
+    """Use `path` as the workspace for this session (None: back to the default)."""
+    global _workspace
+    _workspace = os.path.abspath(os.path.expanduser(path)) if path else None
+    return workspace_root()
+
+
+def workspace_root():
+    root = _workspace or os.environ.get(WORKSPACE_ENV)
+    if root:
+        return os.path.abspath(os.path.expanduser(root))
+    return COLAB_ROOT if os.path.isdir(COLAB_ROOT) else os.getcwd()
+
+
+def workspace_path(name, root=None):
+    """`name` under the workspace (or `root`); absolute and ~ paths are kept as they are."""
+    name = os.path.expanduser(name)
+    return name if os.path.isabs(name) else os.path.join(root or workspace_root(), name)
+
+
+def find_input(name, exts=()):
+    """
+    First existing file among `name` (when it already ends in one of
+    `exts`) and name + ext, looked up as given and then in the workspace.
+    None when there is none.
+    """
+    names = [name] if not exts or name.lower().endswith(tuple(exts)) else []
+    names += [name + ext for ext in exts]
+    for cand in names + [workspace_path(n) for n in names]:
+        if os.path.isfile(cand):
+            return cand
+    return None
+
+
+def find_dir(name):
+    """`name` if it is a folder, else the workspace folder of that name, else None."""
+    for cand in (os.path.expanduser(name), workspace_path(name)):
+        if os.path.isdir(cand):
+            return cand
+    return None
+
+
+def scratch_dir():
+    """Private temp folder for this process, created on first use, removed at exit."""
+    global _scratch
+    with _lock:
+        if _scratch is None or not os.path.isdir(_scratch):
+            base = os.environ.get(SCRATCH_ENV) or None
+            if base:
+                os.makedirs(base, exist_ok=True)
+            _scratch = tempfile.mkdtemp(prefix="automindcloud-", dir=base)
+            atexit.register(shutil.rmtree, _scratch, True)
+        return _scratch
+
+
+@contextmanager
+def scratch_file(suffix=""):
+    """Path of a new empty file in scratch_dir(), deleted when the block ends."""
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=scratch_dir())
+    os.close(fd)
+    try:
+        yield path
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+@contextmanager
+def map_file(path):
+    """Read-only buffer of a file: an mmap, or its bytes where mmap isn't possible (empty files)."""
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            yield f.read()
+            return
+        try:
+            yield mm
+        finally:
+            mm.close()
@@ -0,0 +1,86 @@
+// /viewer/core/AMCM.js
+// Decodificador del contenedor AMCM (ver AutoMindCloud/_mesh_codec.py).
+// Única copia: AssetDB.js lo importa y Step_Render lo incrusta vía _viewer.bundle(..., script=True).
+/* global THREE */
+
+export function isAMCM(bytes) {
+  return bytes.length >= 8 && bytes[0] === 0x41 && bytes[1] === 0x4d && bytes[2] === 0x43 && bytes[3] === 0x4d;
+}
+
+/**
+ * Decodifica un contenedor AMCM a arreglos planos (sin THREE).
+ * @param {Uint8Array} bytes
+ * @returns {{positions: Float32Array, normals: Float32Array|null, index: Uint32Array, color: number[]}[]}
+ */
+export function parseAMCM(bytes) {
+  const dv = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  const hasNormals = (dv.getUint8(5) & 1) === 1;
+  const count = dv.getUint16(6, true);
+  const out = [];
+  let off = 8;
+  for (let m = 0; m < count; m++) {
+    const nv = dv.getUint32(off, true);
+    const ni = dv.getUint32(off + 4, true);
+    const nib = dv.getUint32(off + 8, true);
+    const color = [bytes[off + 12], bytes[off + 13], bytes[off + 14], bytes[off + 15]];
+    const lo = [0, 1, 2].map((i) => dv.getFloat32(off + 16 + 4 * i, true));
+    const span = [0, 1, 2].map((i) => dv.getFloat32(off + 28 + 4 * i, true));
+    off += 40;
+
+    // Posiciones: uint16 cuantizadas dentro del bbox
+    const positions = new Float32Array(nv * 3);
+    for (let i = 0; i < nv * 3; i++) {
+      const c = i % 3;
+      positions[i] = lo[c] + (dv.getUint16(off + 2 * i, true) / 65535) * span[c];
+    }
+    off += 6 * nv;
+
+    // Normales: octaedro en 2 x int8
+    let normals = null;
+    if (hasNormals) {
+      normals = new Float32Array(nv * 3);
+      for (let v = 0; v < nv; v++) {
+        let x = dv.getInt8(off + 2 * v) / 127;
+        let y = dv.getInt8(off + 2 * v + 1) / 127;
+        const z = 1 - Math.abs(x) - Math.abs(y);
+        if (z < 0) {
+          const t = x;
+          x = (1 - Math.abs(y)) * (x >= 0 ? 1 : -1);
+          y = (1 - Math.abs(t)) * (y >= 0 ? 1 : -1);
+        }
+        const len = Math.hypot(x, y, z) || 1;
+        normals[3 * v] = x / len; normals[3 * v + 1] = y / len; normals[3 * v + 2] = z / len;
+      }
+      off += 2 * nv;
+    }
+
+    // Índices: delta + zigzag + varint
+    const index = new Uint32Array(ni);
+    let p = off, cur = 0;
+    for (let i = 0; i < ni; i++) {
+      let z = 0, mul = 1, b;
+      do { b = bytes[p++]; z += (b & 0x7f) * mul; mul *= 128; } while (b & 0x80);
+      cur += (z % 2) ? -(z + 1) / 2 : z / 2;
+      index[i] = cur;
+    }
+    off += nib;
+    off += (4 - (off % 4)) % 4;
+
+    out.push({ positions, normals, index, color });
+  }
+  return out;
+}
+
+/** BufferGeometry desde una parte de parseAMCM (normales planas si no vienen, como STLLoader). */
+export function amcmGeometry(part) {
+  let geom = new THREE.BufferGeometry();
+  geom.setAttribute('position', new THREE.BufferAttribute(part.positions, 3));
+  geom.setIndex(new THREE.BufferAttribute(part.index, 1));
+  if (part.normals) {
+    geom.setAttribute('normal', new THREE.BufferAttribute(part.normals, 3));
+  } else {
+    geom = geom.toNonIndexed();
+    geom.computeVertexNormals();
+  }
+  return geom;
+}
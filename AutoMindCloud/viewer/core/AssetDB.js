@@ -3,9 +3,13 @@
 // Three r132 + urdf-loader 0.12.6
 /* global THREE */
 
-const ALLOWED_MESH_EXTS = new Set(['dae', 'stl', 'step', 'stp']);
+import { isAMCM, parseAMCM, amcmGeometry } from './AMCM.js';
+
+const ALLOWED_MESH_EXTS = new Set(['dae', 'stl', 'obj', 'glb', 'step', 'stp']);
 const ALLOWED_TEX_EXTS  = new Set(['png', 'jpg', 'jpeg']);
-const EXT_PRIORITY = { dae: 3, stl: 2, step: 1, stp: 1 };
+const EXT_PRIORITY = { dae: 3, glb: 3, stl: 2, obj: 2, step: 1, stp: 1 };
+// Formatos que buildFromBytes sabe construir
+const BUILDABLE_EXTS = new Set(['dae', 'stl', 'obj', 'glb']);
 
 const MIME = {
   png: 'image/png',
@@ -13,6 +17,8 @@ const MIME = {
   jpeg: 'image/jpeg',
   stl: 'model/stl',                    // informative; we parse from bytes
   dae: 'model/vnd.collada+xml',
+  obj: 'model/obj',
+  glb: 'model/gltf-binary',
   step:'model/step',
   stp: 'model/step'
 };
@@ -77,8 +83,11 @@ function b64ToUint8(b64) {
   for (let i = 0; i < len; i++) out[i] = bin.charCodeAt(i);
   return out;
 }
-function b64ToText(b64) {
-  return textDecoder.decode(b64ToUint8(b64));
+
+async function fetchBytes(url) {
+  const r = await fetch(url);
+  if (!r.ok) throw new Error(`HTTP ${r.status} for ${url}`);
+  return new Uint8Array(await r.arrayBuffer());
 }
 
 /* ---------- public: buildAssetDB ---------- */
@@ -86,61 +95,82 @@ function b64ToText(b64) {
 /**
  * Normaliza claves y crea índices de búsqueda.
  * @param {Object.<string,string>} meshDB  — mapa key(base/path) → base64
+ * @param {Object.<string,string>} [meshURLs] — mapa key → URL (servidor de assets local)
+ * @param {Object.<string,string>} [meshAliases] — mapa key → key de meshDB/meshURLs con el mismo archivo
+ * @param {Object.<string,string>} [meshLOD] — mapa key → base64 de un STL simplificado (nivel de detalle grueso)
  * @returns {{
  *   byKey: Object.<string,string>,
+ *   urlByKey: Object.<string,string>,
+ *   lodByKey: Object.<string,string>,
  *   byBase: Map<string, string[]>,
  *   has(key: string): boolean,
  *   get(key: string): string|undefined,
  *   keys(): string[]
  * }}
  */
-export function buildAssetDB(meshDB = {}) {
+export function buildAssetDB(meshDB = {}, meshURLs = {}, meshAliases = {}, meshLOD = {}) {
   const byKey = {};
+  const urlByKey = {};
+  const lodByKey = {};
   const byBase = new Map();
 
   // 1) Normaliza y duplica entradas útiles (sin package://)
-  Object.keys(meshDB).forEach((rawKey) => {
-    const b64 = meshDB[rawKey];
-    if (!b64) return;
+  function register(table, rawKey, value) {
+    if (!value) return;
 
     const k = normKey(rawKey);
     const kNoPkg = dropPackagePrefix(k);
     const base = basenameNoQuery(k);
 
     // Registra k
-    if (!byKey[k]) byKey[k] = b64;
+    if (!table[k]) table[k] = value;
 
     // Registra variante sin package://
-    if (kNoPkg !== k && !byKey[kNoPkg]) byKey[kNoPkg] = b64;
+    if (kNoPkg !== k && !table[kNoPkg]) table[kNoPkg] = value;
 
     // También permite lookup por basename (no exclusivo; puede haber duplicados)
     const arr = byBase.get(base) || [];
     arr.push(k);               // guardamos la key "completa" como referencia principal
     if (kNoPkg !== k) arr.push(kNoPkg);
     byBase.set(base, Array.from(new Set(arr)));
+  }
+  Object.keys(meshDB).forEach((rawKey) => register(byKey, rawKey, meshDB[rawKey]));
+  Object.keys(meshURLs || {}).forEach((rawKey) => register(urlByKey, rawKey, meshURLs[rawKey]));
+  Object.keys(meshLOD || {}).forEach((rawKey) => register(lodByKey, rawKey, meshLOD[rawKey]));
+
+  // 2) Alias: misma referencia al string del blob (no se duplica el base64)
+  Object.keys(meshAliases || {}).forEach((rawKey) => {
+    const target = normKey(meshAliases[rawKey]);
+    if (byKey[target]) register(byKey, rawKey, byKey[target]);
+    else if (urlByKey[target]) register(urlByKey, rawKey, urlByKey[target]);
+    if (lodByKey[target]) register(lodByKey, rawKey, lodByKey[target]);
   });
 
+  const present = (k) => !!(byKey[k] || urlByKey[k] || lodByKey[k]);
+
   return {
     byKey,
+    urlByKey,
+    lodByKey,
     byBase,
     has(key) {
       const ks = variantsFor(key);
-      return !!ks.find((k) => !!byKey[k]);
+      return !!ks.find(present);
     },
     get(key) {
       const ks = variantsFor(key);
       for (const k of ks) {
-        if (byKey[k]) return byKey[k];
+        if (present(k)) return byKey[k] || urlByKey[k] || lodByKey[k];
       }
       // último recurso: basename
       const base = basenameNoQuery(key);
       const arr = byBase.get(base) || [];
       for (const k of arr) {
-        if (byKey[k]) return byKey[k];
+        if (present(k)) return byKey[k] || urlByKey[k] || lodByKey[k];
       }
       return undefined;
     },
-    keys() { return Object.keys(byKey); }
+    keys() { return Array.from(new Set([...Object.keys(byKey), ...Object.keys(urlByKey), ...Object.keys(lodByKey)])); }
   };
 }
 
@@ -152,7 +182,7 @@ function pickBestKey(tryKeys, assetDB) {
   for (const kk of tryKeys) {
     const k = normKey(kk);
     const b64 = assetDB.byKey[k];
-    if (!b64) continue;
+    if (!b64 && !assetDB.urlByKey?.[k] && !assetDB.lodByKey?.[k]) continue;
     const ext = extOf(k);
     if (!ALLOWED_MESH_EXTS.has(ext)) continue;
     const base = basenameNoQuery(k);
@@ -161,7 +191,7 @@ function pickBestKey(tryKeys, assetDB) {
       key: k,
       ext,
       prio: EXT_PRIORITY[ext] ?? 0,
-      bytes: approxBytesFromB64(b64)
+      bytes: b64 ? approxBytesFromB64(b64) : 0
     });
     groups.set(base, arr);
   }
@@ -177,15 +207,52 @@ function pickBestKey(tryKeys, assetDB) {
 
 /**
  * Crea un callback compatible con URDFLoader.loadMeshCb(path, manager, onComplete)
- * que renderiza STL/DAE desde base64 + resuelve subrecursos embebidos (texturas).
+ * que renderiza STL/DAE/OBJ/GLB desde base64 + resuelve subrecursos embebidos (texturas).
  *
  * @param {*} assetDB - resultado de buildAssetDB()
  * @param {Object} [hooks]
  * @param {(meshOrGroup:THREE.Object3D, assetKey:string)=>void} [hooks.onMeshTag] - se llama tras crear el objeto
  * @returns {(path:string, manager:THREE.LoadingManager, onComplete:(obj:THREE.Object3D)=>void)=>void}
+ *   El callback expone además upgrade(assetKey) / upgradeAll(): los STL con LOD se muestran
+ *   primero en su versión simplificada y esas funciones cargan la geometría completa.
  */
 export function createLoadMeshCb(assetDB, hooks = {}) {
   const daeCache = new Map();
+  const sceneCache = new Map(); // OBJ/GLB: assetKey -> Object3D original (se entregan clones)
+  const coarseMeshes = new Map(); // assetKey -> Mesh[] que aún muestran el LOD grueso
+
+  function stlGeometry(bytes) {
+    if (isAMCM(bytes)) return amcmGeometry(parseAMCM(bytes)[0]);
+    const loader = new THREE.STLLoader();
+    const geom = loader.parse(bytes.buffer);
+    geom.computeVertexNormals?.();
+    return geom;
+  }
+
+  async function fullBytes(key) {
+    const b64 = assetDB.byKey[key];
+    if (b64) return b64ToUint8(b64);
+    const url = assetDB.urlByKey?.[key];
+    if (url) return fetchBytes(url);
+    throw new Error(`No asset for ${key}`);
+  }
+
+  async function upgrade(key) {
+    const meshes = coarseMeshes.get(key);
+    if (!meshes) return;
+    coarseMeshes.delete(key);
+    try {
+      const geom = stlGeometry(await fullBytes(key));
+      for (const m of meshes) {
+        const old = m.geometry;
+        m.geometry = geom;
+        m.userData.__lod = 'full';
+        try { old?.dispose?.(); } catch (_) {}
+      }
+    } catch (_e) {
+      // nos quedamos con el LOD grueso
+    }
+  }
 
   function tagAll(obj, key) {
     obj.userData.__assetKey = key;
@@ -203,7 +270,20 @@ export function createLoadMeshCb(assetDB, hooks = {}) {
     return new THREE.Mesh(); // placeholder neutral
   }
 
-  return function loadMeshCb(path, _manager, onComplete) {
+  function defaultMaterial() {
+    return new THREE.MeshStandardMaterial({
+      color: 0x7fd4d4,
+      roughness: 0.85,
+      metalness: 0.12,
+      side: THREE.DoubleSide
+    });
+  }
+
+  function stlMesh(geom) {
+    return new THREE.Mesh(geom, defaultMaterial());
+  }
+
+  function loadMeshCb(path, _manager, onComplete) {
     try {
       const tries = variantsFor(path);
       const bestKey = pickBestKey(tries, assetDB);
@@ -214,7 +294,9 @@ export function createLoadMeshCb(assetDB, hooks = {}) {
 
       const ext = extOf(bestKey);
       const b64 = assetDB.byKey[bestKey];
-      if (!b64) {
+      const url = assetDB.urlByKey?.[bestKey];
+      // sin b64 ni URL: páginas embebidas con solo el LOD grueso (ver lod_faces)
+      if (!b64 && !url && !assetDB.lodByKey?.[bestKey]) {
         onComplete(makeEmpty());
         return;
       }
@@ -225,39 +307,59 @@ export function createLoadMeshCb(assetDB, hooks = {}) {
         return;
       }
 
-      // STL binario
-      if (ext === 'stl') {
-        const bytes = b64ToUint8(b64);
-        const loader = new THREE.STLLoader();
-        const geom = loader.parse(bytes.buffer);
-        geom.computeVertexNormals?.();
-        const mesh = new THREE.Mesh(
-          geom,
-          new THREE.MeshStandardMaterial({
-            color: 0x7fd4d4,
-            roughness: 0.85,
-            metalness: 0.12,
-            side: THREE.DoubleSide
-          })
-        );
+      // Nivel de detalle grueso primero; la geometría completa llega con upgrade()
+      const lod = assetDB.lodByKey?.[bestKey];
+      if (lod && ext === 'stl') {
+        const mesh = stlMesh(stlGeometry(b64ToUint8(lod)));
+        mesh.userData.__lod = 'coarse';
+        const list = coarseMeshes.get(bestKey) || [];
+        list.push(mesh);
+        coarseMeshes.set(bestKey, list);
         tagAll(mesh, bestKey);
         hooks.onMeshTag?.(mesh, bestKey);
         onComplete(mesh);
         return;
       }
 
+      // Asset servido por URL: se descarga (binario, cacheable) y se procesa igual que el embebido
+      if (!b64) {
+        if (!BUILDABLE_EXTS.has(ext)) {
+          onComplete(makeEmpty());
+          return;
+        }
+        fetchBytes(url)
+          .then((bytes) => buildFromBytes(bestKey, ext, bytes))
+          .catch(() => onComplete(makeEmpty()));
+        return;
+      }
+
+      buildFromBytes(bestKey, ext, b64ToUint8(b64));
+    } catch (_e) {
+      try { onComplete(makeEmpty()); } catch (_ee) {}
+    }
+
+    function buildFromBytes(key, ext, bytes) {
+      // STL binario
+      if (ext === 'stl') {
+        const mesh = stlMesh(stlGeometry(bytes));
+        tagAll(mesh, key);
+        hooks.onMeshTag?.(mesh, key);
+        onComplete(mesh);
+        return;
+      }
+
       // DAE texto + subrecursos
       if (ext === 'dae') {
         // Cache por key para reusar escenas clonadas
-        if (daeCache.has(bestKey)) {
-          const obj = daeCache.get(bestKey).clone(true);
-          tagAll(obj, bestKey);
-          hooks.onMeshTag?.(obj, bestKey);
+        if (daeCache.has(key)) {
+          const obj = daeCache.get(key).clone(true);
+          tagAll(obj, key);
+          hooks.onMeshTag?.(obj, key);
           onComplete(obj);
           return;
         }
 
-        const daeText = b64ToText(b64);
+        const daeText = textDecoder.decode(bytes);
 
         // Extrae unidad <unit meter="..."> para escalar correcto
         let scale = 1.0;
@@ -277,6 +379,8 @@ export function createLoadMeshCb(assetDB, hooks = {}) {
             const b = assetDB.byKey[k];
             return dataURLFor(e, b);
           }
+          const ku = v.find((x) => assetDB.urlByKey?.[x]);
+          if (ku) return assetDB.urlByKey[ku];
           return url; // fallback: deja URL original (por si acaso)
         });
 
@@ -286,21 +390,52 @@ export function createLoadMeshCb(assetDB, hooks = {}) {
         if (scale !== 1.0) obj.scale.setScalar(scale);
 
         // Cachea el original y devuelve un clon para no compartir refs
-        daeCache.set(bestKey, obj);
+        daeCache.set(key, obj);
         const clone = obj.clone(true);
 
-        tagAll(clone, bestKey);
-        hooks.onMeshTag?.(clone, bestKey);
+        tagAll(clone, key);
+        hooks.onMeshTag?.(clone, key);
         onComplete(clone);
         return;
       }
 
+      // OBJ (texto) / GLB (binario autocontenido); requieren OBJLoader / GLTFLoader UMD
+      if (ext === 'obj' || ext === 'glb') {
+        const deliver = (obj) => {
+          sceneCache.set(key, obj);
+          const clone = obj.clone(true);
+          tagAll(clone, key);
+          hooks.onMeshTag?.(clone, key);
+          onComplete(clone);
+        };
+        if (sceneCache.has(key)) {
+          deliver(sceneCache.get(key));
+          return;
+        }
+        if (ext === 'obj' && THREE.OBJLoader) {
+          const obj = new THREE.OBJLoader().parse(textDecoder.decode(bytes));
+          // Sin .mtl: mismo material que los STL
+          obj.traverse((o) => { if (o.isMesh) o.material = defaultMaterial(); });
+          deliver(obj);
+          return;
+        }
+        if (ext === 'glb' && THREE.GLTFLoader) {
+          const buf = bytes.buffer.slice(bytes.byteOffset, bytes.byteOffset + bytes.byteLength);
+          new THREE.GLTFLoader().parse(buf, '', (gltf) => deliver(gltf.scene),
+            () => onComplete(makeEmpty()));
+          return;
+        }
+      }
+
       // Ext desconocido (o no permitido): placeholder
       onComplete(makeEmpty());
-    } catch (_e) {
-      try { onComplete(makeEmpty()); } catch (_ee) {}
     }
-  };
+  }
+
+  loadMeshCb.upgrade = upgrade;
+  loadMeshCb.upgradeAll = () => Promise.all(Array.from(coarseMeshes.keys()).map(upgrade));
+  loadMeshCb.hasCoarse = () => coarseMeshes.size > 0;
+  return loadMeshCb;
 }
 
 /* ---------- (opcional) export ALLOWED sets if UI wants them ---------- */
@@ -14,6 +14,10 @@ import { createComponentsPanel } from './ui/ComponentsPanel.js';
  * @param {HTMLElement} opts.container
  * @param {string} opts.urdfContent              — URDF string
  * @param {Object.<string,string>} opts.meshDB   — key → base64
+ * @param {Object.<string,string>} [opts.meshURLs] — key → URL (assets served out-of-band)
+ * @param {Object.<string,string>} [opts.meshAliases] — key → key of meshDB/meshURLs with the same file
+ * @param {Object.<string,string>} [opts.meshLOD] — key → base64 of a decimated STL shown first
+ * @param {boolean} [opts.lodAutoUpgrade=true] — swap in full meshes once the first frame is up
  * @param {'link'|'mesh'} [opts.selectMode='link']
  * @param {number|null} [opts.background=THEME.bgCanvas]
  * @param {string|null} [opts.clickAudioDataURL] — optional UI SFX (not required)
@@ -23,6 +27,10 @@ export function render(opts = {}) {
     container,
     urdfContent = '',
     meshDB = {},
+    meshURLs = {},
+    meshAliases = {},
+    meshLOD = {},
+    lodAutoUpgrade = true,
     selectMode = 'link',
     background = THEME.bgCanvas || 0xffffff,
     clickAudioDataURL = null
@@ -32,7 +40,7 @@ export function render(opts = {}) {
   const core = createViewer({ container, background });
 
   // 2) Asset DB + loadMeshCb with onMeshTag hook to index meshes by assetKey
-  const assetDB = buildAssetDB(meshDB);
+  const assetDB = buildAssetDB(meshDB, meshURLs, meshAliases, meshLOD);
   const assetToMeshes = new Map(); // assetKey -> Mesh[]
   const loadMeshCb = createLoadMeshCb(assetDB, {
     onMeshTag(obj, assetKey) {
@@ -83,6 +91,12 @@ export function render(opts = {}) {
     // --- Show all ---
     showAll: () => showAll(core),
 
+    // --- Levels of detail (meshLOD): swap coarse meshes for full ones ---
+    lod: {
+      upgrade: (assetKey) => loadMeshCb.upgrade(assetKey),
+      upgradeAll: () => loadMeshCb.upgradeAll()
+    },
+
     // Optional: open tools externally
     openTools(open = true) { tools.set(!!open); }
   };
@@ -91,6 +105,11 @@ export function render(opts = {}) {
   const tools = createToolsDock(app, THEME);
   const comps = createComponentsPanel(app, THEME);
 
+  // Coarse meshes render the first frame; full resolution is swapped in right after
+  if (lodAutoUpgrade && loadMeshCb.hasCoarse()) {
+    requestAnimationFrame(() => requestAnimationFrame(() => { loadMeshCb.upgradeAll(); }));
+  }
+
   // Optional click SFX for UI (kept minimal; UI modules do not depend on it)
   if (clickAudioDataURL) {
     try { installClickSound(clickAudioDataURL); } catch (_) {}
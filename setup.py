@@ -59,6 +59,12 @@ setup(
     ],
     packages=find_packages(),
     include_package_data=True,
+    entry_points={
+        "console_scripts": [
+            "automindcloud-ortho=AutoMindCloud.Orthographic_Batch_Script:main",
+            "automindcloud-glb=AutoMindCloud.Step_Batch_Script:main",
+        ],
+    },
 )
 
 
@@ -0,0 +1,49 @@
+"""
+`import AutoMindCloud` must stay cheap and free of side effects: the heavy
+renderer/calculus dependencies are only imported on first use (see
+AutoMindCloud/__init__.py).
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time of the package itself (python -X importtime), in seconds.
+IMPORT_BUDGET = 0.05
+HEAVY = ("IPython", "sympy", "trimesh", "cadquery", "numpy", "ipywidgets", "gdown", "requests")
+
+
+def _run(code):
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, env=env, cwd=ROOT)
+    assert proc.returncode == 0, proc.stderr
+    return proc
+
+
+def _package_import_seconds(stderr):
+    for line in stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == "AutoMindCloud":
+            return int(parts[1]) / 1e6
+    raise AssertionError("AutoMindCloud missing from -X importtime output")
+
+
+def test_import_loads_no_heavy_dependencies():
+    proc = _run("import sys, json, AutoMindCloud; dir(AutoMindCloud); "
+                "print(json.dumps(sorted(m for m in %r if m in sys.modules)))" % (HEAVY,))
+    assert json.loads(proc.stdout.strip().splitlines()[-1]) == []
+
+
+def test_import_has_no_output():
+    assert _run("import AutoMindCloud").stdout == ""
+
+
+def test_import_time_budget():
+    best = min(_package_import_seconds(_run("import AutoMindCloud").stderr) for _ in range(3))
+    assert best < IMPORT_BUDGET, "import AutoMindCloud took %.1f ms (budget %.0f ms)" % (
+        best * 1e3, IMPORT_BUDGET * 1e3)
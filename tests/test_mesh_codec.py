@@ -0,0 +1,93 @@
+"""AMCM container (AutoMindCloud/_mesh_codec.py): encode -> decode round trips."""
+
+import json
+import shutil
+import subprocess
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from AutoMindCloud import _mesh_codec
+
+trimesh = pytest.importorskip("trimesh")
+
+
+def _triangles(part):
+    return part["positions"][part["index"]].reshape(-1, 3, 3)
+
+
+def _tolerance(tris):
+    span = np.ptp(np.asarray(tris).reshape(-1, 3), axis=0)
+    return float(span.max()) / 65535.0 + 1e-6
+
+
+def test_round_trip_flat():
+    meshes = [trimesh.creation.box(extents=(1, 2, 3)), trimesh.creation.icosphere(2)]
+    colors = [(255, 0, 0, 255), (10, 20, 30, 128)]
+    parts = _mesh_codec.decode(_mesh_codec.encode_meshes(meshes, colors))
+    assert len(parts) == 2
+    for mesh, rgba, part in zip(meshes, colors, parts):
+        assert part["rgba"] == rgba
+        assert part["normals"] is None
+        assert len(part["index"]) == 3 * len(mesh.faces)
+        assert len(part["positions"]) == len(mesh.vertices)  # identical corners merged
+        assert np.allclose(_triangles(part), mesh.triangles, atol=_tolerance(mesh.triangles))
+
+
+def test_round_trip_normals():
+    mesh = trimesh.creation.icosphere(3)
+    part = _mesh_codec.decode(_mesh_codec.encode_meshes([mesh], normals=True))[0]
+    n = part["normals"][part["index"]].reshape(-1, 3, 3)
+    expected = mesh.vertex_normals[mesh.faces]
+    assert np.degrees(np.arccos(np.clip((n * expected).sum(axis=2), -1, 1))).max() < 1.5
+
+
+def test_round_trip_scene():
+    scene = trimesh.Scene()
+    scene.add_geometry(trimesh.creation.box(), transform=trimesh.transformations.translation_matrix((5, 0, 0)))
+    part = _mesh_codec.decode(_mesh_codec.encode_scene(scene))[0]
+    assert np.allclose(part["positions"].min(axis=0), (4.5, -0.5, -0.5), atol=1e-4)
+
+
+def _many(count, color_of):
+    tri = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]], dtype=np.float64)
+    meshes = [SimpleNamespace(triangles=(tri + i)[None]) for i in range(count)]
+    return meshes, [color_of(i) for i in range(count)]
+
+
+@pytest.mark.parametrize("color_of", [lambda i: (255, i % 2, 0, 255), lambda i: (i % 256, (i // 256) % 256, i // 65536, 255)])
+def test_mesh_count_overflow(color_of):
+    count = _mesh_codec.MAX_MESHES + 10
+    meshes, colors = _many(count, color_of)
+    parts = _mesh_codec.decode(_mesh_codec.encode_meshes(meshes, colors))
+    assert len(parts) <= _mesh_codec.MAX_MESHES
+    assert sum(len(p["index"]) for p in parts) == 3 * count
+    decoded = np.concatenate([_triangles(p) for p in parts])
+    expected = np.concatenate([m.triangles for m in meshes])
+    tol = max(_tolerance(np.concatenate([m.triangles for m, c in zip(meshes, colors) if c == p["rgba"]]))
+              for p in parts)
+    order = lambda a: a[np.lexsort(a.reshape(len(a), -1).T[::-1])]
+    assert np.allclose(order(decoded), order(expected), atol=tol)
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+def test_browser_decoder_matches():
+    """viewer/core/AMCM.js, as inlined by Step_Render, decodes like decode()."""
+    from AutoMindCloud import _viewer
+
+    data = _mesh_codec.encode_meshes([trimesh.creation.icosphere(1), trimesh.creation.box()],
+                                     [(1, 2, 3, 4), (200, 100, 50, 255)], normals=True)
+    script = _viewer.bundle("core/AMCM.js", script=True)[0] + """
+const bytes = new Uint8Array(require('fs').readFileSync(0));
+process.stdout.write(JSON.stringify(parseAMCM(bytes).map(p => ({
+  positions: Array.from(p.positions), normals: Array.from(p.normals),
+  index: Array.from(p.index), color: p.color }))));
+"""
+    proc = subprocess.run(["node", "-e", script], input=data, capture_output=True, check=True)
+    js = json.loads(proc.stdout)
+    for a, b in zip(js, _mesh_codec.decode(data)):
+        assert tuple(a["color"]) == b["rgba"]
+        assert a["index"] == b["index"].tolist()
+        assert np.allclose(a["positions"], b["positions"].ravel(), atol=1e-6)
+        assert np.allclose(a["normals"], b["normals"].ravel(), atol=1e-6)